@@ -24,7 +24,7 @@ import {
   TrendingUp,
   TrendingDown,
 } from '@mui/icons-material';
-import { propertiesAPI, clientsAPI, transactionsAPI, appointmentsAPI } from '../services/api';
+import { dashboardAPI } from '../services/api';
 import { format } from 'date-fns';
 
 const StatCard = ({ title, value, icon, color, trend }) => (
@@ -84,37 +84,16 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [propertiesRes, clientsRes, transactionsRes, appointmentsRes] =
-        await Promise.all([
-          propertiesAPI.getAll(),
-          clientsAPI.getAll(),
-          transactionsAPI.getAll(),
-          appointmentsAPI.getAll(),
-        ]);
-
-      const totalRevenue = transactionsRes.data.reduce(
-        (sum, transaction) => sum + parseFloat(transaction.sale_price),
-        0
-      );
+      const { data } = await dashboardAPI.getSummary();
 
       setStats({
-        properties: propertiesRes.data.length,
-        clients: clientsRes.data.length,
-        revenue: totalRevenue,
-        appointments: appointmentsRes.data.length,
+        properties: data.properties,
+        clients: data.clients,
+        revenue: data.total_revenue,
+        appointments: data.appointments,
       });
-
-      // Get recent properties
-      const sortedProperties = [...propertiesRes.data]
-        .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-        .slice(0, 5);
-      setRecentProperties(sortedProperties);
-
-      // Get recent transactions
-      const sortedTransactions = [...transactionsRes.data]
-        .sort((a, b) => new Date(b.transaction_date) - new Date(a.transaction_date))
-        .slice(0, 5);
-      setRecentTransactions(sortedTransactions);
+      setRecentProperties(data.recent_properties);
+      setRecentTransactions(data.recent_transactions);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
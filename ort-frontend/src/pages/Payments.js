@@ -58,6 +58,7 @@ import { format } from 'date-fns';
 const Payments = () => {
   const [payments, setPayments] = useState([]);
   const [transactions, setTransactions] = useState([]);
+  const [balances, setBalances] = useState({});
   const [openDialog, setOpenDialog] = useState(false);
   const [editingPayment, setEditingPayment] = useState(null);
   const [openViewDialog, setOpenViewDialog] = useState(false);
@@ -95,6 +96,10 @@ const Payments = () => {
       ]);
       setPayments(paymentsRes.data);
       setTransactions(transactionsRes.data);
+
+      const transactionIds = transactionsRes.data.map(t => t.id);
+      const balancesRes = await transactionsAPI.getBalances(transactionIds);
+      setBalances(Object.fromEntries(balancesRes.map(b => [b.transaction_id, b])));
     } catch (error) {
       showSnackbar('Error fetching data', 'error');
     } finally {
@@ -256,25 +261,13 @@ const Payments = () => {
   };
 
   const getTransactionProgress = (transactionId) => {
-    const transaction = getTransactionInfo(transactionId);
-    if (!transaction) return 0;
-    
-    const totalPaid = payments
-      .filter(p => p.transaction_id === transactionId)
-      .reduce((sum, p) => sum + parseFloat(p.amount), 0);
-    
-    return (totalPaid / parseFloat(transaction.sale_price)) * 100;
+    const balance = balances[transactionId];
+    return balance ? balance.percent_paid : 0;
   };
 
   const getRemainingBalance = (transactionId) => {
-    const transaction = getTransactionInfo(transactionId);
-    if (!transaction) return 0;
-    
-    const totalPaid = payments
-      .filter(p => p.transaction_id === transactionId)
-      .reduce((sum, p) => sum + parseFloat(p.amount), 0);
-    
-    return parseFloat(transaction.sale_price) - totalPaid;
+    const balance = balances[transactionId];
+    return balance ? balance.remaining_balance : 0;
   };
 
   return (
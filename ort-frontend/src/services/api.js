@@ -4,79 +4,138 @@ const API_BASE_URL = 'http://localhost:8000/api/v1';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Send the backend's read-your-writes cookie so reads right after a save
+  // are served from the primary database.
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },
 });
 
+// Collection endpoints return { items, next_cursor }; follow the cursors so
+// pages that still need the whole collection keep receiving a plain array.
+const getAllPages = async (url, params = {}) => {
+  let items = [];
+  let cursor = null;
+  let response;
+  do {
+    response = await api.get(url, { params: { ...params, limit: 200, cursor } });
+    items = items.concat(response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return { ...response, data: items };
+};
+
 // Users API
 export const usersAPI = {
-  getAll: () => api.get('/users'),
+  getAll: (params) => getAllPages('/users/', params),
+  getPage: (params) => api.get('/users/', { params }),
+  getByIds: (ids) => api.get('/users/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/users/${id}`),
   create: (userData) => api.post('/users', userData),
   update: (id, userData) => api.put(`/users/${id}`, userData),
+  patch: (id, changes) => api.patch(`/users/${id}`, changes),
   delete: (id) => api.delete(`/users/${id}`),
+  deleteMany: (ids) => api.delete('/users/', { params: { ids: ids.join(',') } }),
 };
 
 // Clients API
 export const clientsAPI = {
-  getAll: () => api.get('/clients'),
+  getAll: (params) => getAllPages('/clients/', params),
+  getPage: (params) => api.get('/clients/', { params }),
+  getByIds: (ids) => api.get('/clients/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/clients/${id}`),
   create: (clientData) => api.post('/clients', clientData),
   update: (id, clientData) => api.put(`/clients/${id}`, clientData),
+  patch: (id, changes) => api.patch(`/clients/${id}`, changes),
   delete: (id) => api.delete(`/clients/${id}`),
+  deleteMany: (ids) => api.delete('/clients/', { params: { ids: ids.join(',') } }),
 };
 
 // Properties API
 export const propertiesAPI = {
-  getAll: () => api.get('/properties'),
+  getAll: (params) => getAllPages('/properties/', params),
+  getPage: (params) => api.get('/properties/', { params }),
+  getByIds: (ids) => api.get('/properties/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/properties/${id}`),
   create: (propertyData) => api.post('/properties', propertyData),
   update: (id, propertyData) => api.put(`/properties/${id}`, propertyData),
+  patch: (id, changes) => api.patch(`/properties/${id}`, changes),
   delete: (id) => api.delete(`/properties/${id}`),
+  deleteMany: (ids) => api.delete('/properties/', { params: { ids: ids.join(',') } }),
 };
 
 // Property Images API
 export const propertyImagesAPI = {
-  getAll: () => api.get('/property-images'),
+  getAll: (params) => getAllPages('/property-images/', params),
+  getPage: (params) => api.get('/property-images/', { params }),
+  getByIds: (ids) => api.get('/property-images/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/property-images/${id}`),
   create: (imageData) => api.post('/property-images', imageData),
   delete: (id) => api.delete(`/property-images/${id}`),
+  deleteMany: (ids) => api.delete('/property-images/', { params: { ids: ids.join(',') } }),
 };
 
 // Listings API
 export const listingsAPI = {
-  getAll: () => api.get('/listings'),
+  getAll: (params) => getAllPages('/listings/', params),
+  getPage: (params) => api.get('/listings/', { params }),
+  getByIds: (ids) => api.get('/listings/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/listings/${id}`),
   create: (listingData) => api.post('/listings', listingData),
 };
 
 // Inquiries API
 export const inquiriesAPI = {
-  getAll: () => api.get('/inquiries'),
+  getAll: (params) => getAllPages('/inquiries/', params),
+  getPage: (params) => api.get('/inquiries/', { params }),
+  getByIds: (ids) => api.get('/inquiries/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/inquiries/${id}`),
   create: (inquiryData) => api.post('/inquiries', inquiryData),
 };
 
 // Appointments API
 export const appointmentsAPI = {
-  getAll: () => api.get('/appointments'),
+  getAll: (params) => getAllPages('/appointments/', params),
+  getPage: (params) => api.get('/appointments/', { params }),
+  getByIds: (ids) => api.get('/appointments/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/appointments/${id}`),
   create: (appointmentData) => api.post('/appointments', appointmentData),
 };
 
 // Transactions API
 export const transactionsAPI = {
-  getAll: () => api.get('/transactions'),
+  getAll: (params) => getAllPages('/transactions/', params),
+  getPage: (params) => api.get('/transactions/', { params }),
+  getByIds: (ids) => api.get('/transactions/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/transactions/${id}`),
   create: (transactionData) => api.post('/transactions', transactionData),
+  getBalance: (id) => api.get(`/transactions/${id}/balance`),
+  // Payment progress for many transactions, 200 ids per request.
+  getBalances: async (ids) => {
+    const balances = [];
+    for (let i = 0; i < ids.length; i += 200) {
+      const response = await api.get('/transactions/balances', {
+        params: { ids: ids.slice(i, i + 200).join(',') },
+      });
+      balances.push(...response.data);
+    }
+    return balances;
+  },
 };
 
 // Payments API
 export const paymentsAPI = {
-  getAll: () => api.get('/payments'),
+  getAll: (params) => getAllPages('/payments/', params),
+  getPage: (params) => api.get('/payments/', { params }),
+  getByIds: (ids) => api.get('/payments/', { params: { ids: ids.join(',') } }),
   getById: (id) => api.get(`/payments/${id}`),
   create: (paymentData) => api.post('/payments', paymentData),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  getSummary: () => api.get('/dashboard/summary'),
+};
+
 export default api;
\ No newline at end of file
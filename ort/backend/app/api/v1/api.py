@@ -1,19 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+import tempfile
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from app.database.database import get_db
-from app.models.models import User, Client, Property, PropertyImage, Listing, Inquiry, Appointment, Transaction, Payment
+from app.api.v1.bulk import bulk_create
+from app.api.v1.cached import (
+    cacheable, cached_by_ids, cached_page, entity_detail, invalidate_rows, response_tags, tagged,
+)
+from app.api.v1.conditional import conditional, versioned_page
+from app.api.v1.fields import project, sparse_fields
+from app.api.v1.filters import PROPERTY_FILTERS, PROPERTY_SORTS, PropertyFilterParams, apply_filters, parse_sort
+from app.api.v1.includes import PROPERTY_INCLUDES, TRANSACTION_INCLUDES, apply_includes, includes, render
+from app.api.v1.pagination import PageParams, fetch_by_ids, id_list, paginate, parse_ids
+from app.api.v1.serializers import json_response
+from app.api.v1.writes import delete_ids, delete_row, delete_rows, insert_row, update_row
+from app.cache.fragments import fragments
+from app.cache.responses import responses
+from app.core.config import settings
+from app.core.metrics import async_read_pool_metrics, entity_cache_metrics, pool_metrics, read_pool_metrics
+from app.database.database import (
+    AsyncDB, async_replica_pool_metrics, get_async_read_db, read_sessionmaker, replica_pool_metrics,
+)
+from app.database.routing import pinned
+from app.database.writer import WriteQueue, get_writer
+from app.export.export import EXPORTS, MEDIA_TYPES, stream_export
+from app.importer.importer import run_import
+from app.models.models import User, Client, Property, PropertyImage, Listing, Inquiry, Appointment, Transaction, Payment, ImportJob, ImportRowError
 from app.schemas.schemas import (
-    UserCreate, UserResponse,
-    ClientCreate, ClientResponse,
-    PropertyCreate, PropertyResponse,
+    UserCreate, UserUpdate, UserResponse,
+    ClientCreate, ClientUpdate, ClientResponse,
+    PropertyCreate, PropertyUpdate, PropertyResponse,
     PropertyImageCreate, PropertyImageResponse,
     ListingCreate, ListingResponse,
     InquiryCreate, InquiryResponse,
     AppointmentCreate, AppointmentResponse,
     TransactionCreate, TransactionResponse,
-    PaymentCreate, PaymentResponse
+    PaymentCreate, PaymentResponse,
+    PropertyWithIncludes, TransactionWithIncludes,
+    TransactionBalance,
+    DashboardSummary,
+    BulkCreateResult, BulkDeleteResult,
+    ImportJobResponse, ImportRowErrorResponse,
+    Page
 )
 
 router = APIRouter()
@@ -21,359 +54,742 @@ router = APIRouter()
 
 # ========== USER ENDPOINTS ==========
 
-@router.get("/users/", response_model=List[UserResponse])
-def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+@router.get("/users/", response_model=Page[UserResponse])
+async def get_users(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(UserResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(User), [User.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(User))
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_user(
+    request: Request,
+    user_id: int,
+    fields: List[str] = Depends(sparse_fields(UserResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(UserResponse, fields):
+        response = await entity_detail(db, User, user_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return conditional(request, response)
+    user = await db.run(lambda session: project(session.query(User).filter(User.id == user_id), fields).first())
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return conditional(request, json_response(user._asdict()))
 
 
 @router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, writer: WriteQueue = Depends(get_writer)):
     # In production, hash the password before storing
-    db_user = User(
-        role=user.role,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        phone=user.phone,
-        password_hash=user.password  # This should be hashed
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    values = user.dict()
+    values["password_hash"] = values.pop("password")  # This should be hashed
+    created = await writer.call(insert_row, User, values, UserResponse)
+    await invalidate_rows(User, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
 
 
 @router.put("/users/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, user_update: UserCreate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def update_user(user_id: int, user_update: UserCreate, writer: WriteQueue = Depends(get_writer)):
+    values = user_update.dict()
+    values["password_hash"] = values.pop("password")  # This should be hashed
+    user = await writer.call(update_row, User, user_id, values, UserResponse)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Update user fields
-    for key, value in user_update.dict().items():
-        setattr(user, key, value)
-    
-    db.commit()
-    db.refresh(user)
-    return user
+    await invalidate_rows(User, user_id)
+    return json_response(user)
 
 
-@router.delete("/users/{user_id}", status_code=status.HTTP_200_OK)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+@router.patch("/users/{user_id}", response_model=UserResponse)
+async def patch_user(user_id: int, user_update: UserUpdate, writer: WriteQueue = Depends(get_writer)):
+    values = user_update.dict(exclude_unset=True)
+    if "password" in values:
+        values["password_hash"] = values.pop("password")  # This should be hashed
+    user = await writer.call(update_row, User, user_id, values, UserResponse)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    db.delete(user)
-    db.commit()
+    await invalidate_rows(User, user_id)
+    return json_response(user)
+
+
+@router.delete("/users/", response_model=BulkDeleteResult)
+async def delete_users(ids: List[int] = Depends(delete_ids), writer: WriteQueue = Depends(get_writer)):
+    result = await writer.call(delete_rows, User, ids)
+    await invalidate_rows(User, *result["deleted"], deleted=True)
+    return result
+
+
+@router.delete("/users/{user_id}", status_code=status.HTTP_200_OK)
+async def delete_user(user_id: int, writer: WriteQueue = Depends(get_writer)):
+    if not await writer.call(delete_row, User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    await invalidate_rows(User, user_id, deleted=True)
     return {"message": "User deleted successfully"}
 
 
 # ========== CLIENT ENDPOINTS ==========
 
-@router.get("/clients/", response_model=List[ClientResponse])
-def get_clients(db: Session = Depends(get_db)):
-    return db.query(Client).all()
+@router.get("/clients/", response_model=Page[ClientResponse])
+async def get_clients(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(ClientResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(ClientResponse, fields):
+        if ids:
+            response = await db.run(lambda session: cached_by_ids(request, session.query(Client), ids, fields))
+        else:
+            response = await db.run(
+                lambda session: cached_page(request, session.query(Client), [Client.id], page, fields, session.query(Client))
+            )
+        return tagged(response, db, response_tags(Client))
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(Client), [Client.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(Client))
 
 
 @router.get("/clients/{client_id}", response_model=ClientResponse)
-def get_client(client_id: int, db: Session = Depends(get_db)):
-    client = db.query(Client).filter(Client.id == client_id).first()
+async def get_client(
+    request: Request,
+    client_id: int,
+    fields: List[str] = Depends(sparse_fields(ClientResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(ClientResponse, fields):
+        response = await entity_detail(db, Client, client_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+        return conditional(request, response)
+    client = await db.run(lambda session: project(session.query(Client).filter(Client.id == client_id), fields).first())
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    return client
+    return conditional(request, json_response(client._asdict()))
 
 
 @router.post("/clients/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
-def create_client(client: ClientCreate, db: Session = Depends(get_db)):
-    db_client = Client(
-        first_name=client.first_name,
-        last_name=client.last_name,
-        email=client.email,
-        phone=client.phone,
-        client_type=client.client_type,
-        agent_id=client.agent_id
-    )
-    db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
-    return db_client
+async def create_client(client: ClientCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Client, client.dict(), ClientResponse)
+    await invalidate_rows(Client, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
+
+
+@router.post("/clients/bulk", response_model=BulkCreateResult[ClientResponse], status_code=status.HTTP_201_CREATED)
+async def create_clients_bulk(rows: List[Dict[str, Any]], writer: WriteQueue = Depends(get_writer)):
+    return await bulk_create(writer, Client, ClientCreate, ClientResponse, rows)
 
 
 @router.put("/clients/{client_id}", response_model=ClientResponse)
-def update_client(client_id: int, client_update: ClientCreate, db: Session = Depends(get_db)):
-    client = db.query(Client).filter(Client.id == client_id).first()
+async def update_client(client_id: int, client_update: ClientCreate, writer: WriteQueue = Depends(get_writer)):
+    client = await writer.call(update_row, Client, client_id, client_update.dict(), ClientResponse)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    
-    for key, value in client_update.dict().items():
-        setattr(client, key, value)
-    
-    db.commit()
-    db.refresh(client)
-    return client
+    await invalidate_rows(Client, client_id)
+    return json_response(client)
 
 
-@router.delete("/clients/{client_id}", status_code=status.HTTP_200_OK)
-def delete_client(client_id: int, db: Session = Depends(get_db)):
-    client = db.query(Client).filter(Client.id == client_id).first()
+@router.patch("/clients/{client_id}", response_model=ClientResponse)
+async def patch_client(client_id: int, client_update: ClientUpdate, writer: WriteQueue = Depends(get_writer)):
+    client = await writer.call(update_row, Client, client_id, client_update.dict(exclude_unset=True), ClientResponse)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    
-    db.delete(client)
-    db.commit()
+    await invalidate_rows(Client, client_id)
+    return json_response(client)
+
+
+@router.delete("/clients/", response_model=BulkDeleteResult)
+async def delete_clients(ids: List[int] = Depends(delete_ids), writer: WriteQueue = Depends(get_writer)):
+    result = await writer.call(delete_rows, Client, ids)
+    await invalidate_rows(Client, *result["deleted"], deleted=True)
+    return result
+
+
+@router.delete("/clients/{client_id}", status_code=status.HTTP_200_OK)
+async def delete_client(client_id: int, writer: WriteQueue = Depends(get_writer)):
+    if not await writer.call(delete_row, Client, client_id):
+        raise HTTPException(status_code=404, detail="Client not found")
+    await invalidate_rows(Client, client_id, deleted=True)
     return {"message": "Client deleted successfully"}
 
 
 # ========== PROPERTY ENDPOINTS ==========
 
-@router.get("/properties/", response_model=List[PropertyResponse])
-def get_properties(db: Session = Depends(get_db)):
-    return db.query(Property).all()
+@router.get("/properties/", response_model=Page[PropertyResponse])
+async def get_properties(
+    request: Request,
+    filters: PropertyFilterParams = Depends(),
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(PropertyResponse)),
+    include: List[str] = Depends(includes(PROPERTY_INCLUDES)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    keys = parse_sort(filters.sort, PROPERTY_SORTS, Property.id)
+
+    def load(session):
+        base_query = session.query(Property)
+        query = apply_filters(base_query, PROPERTY_FILTERS, filters.filters)
+        if include:
+            # Images, listings and the rest are loaded through relationships,
+            # so included pages are built from Property objects, not columns.
+            query = apply_includes(query, PROPERTY_INCLUDES, include)
+            result = fetch_by_ids(query, ids) if ids else paginate(query, keys, page)
+            result["items"] = [render(obj, PropertyResponse, PropertyWithIncludes, fields, include) for obj in result["items"]]
+            return tagged(conditional(request, json_response(result)), db, response_tags(Property, include, result["items"]))
+        if cacheable(PropertyResponse, fields):
+            if ids:
+                response = cached_by_ids(request, query, ids, fields, base_query)
+            else:
+                response = cached_page(request, query, keys, page, fields, base_query)
+        else:
+            response = versioned_page(request, query, keys, page, ids, fields)
+        return tagged(response, db, response_tags(Property))
+
+    return await db.run(load)
 
 
 @router.get("/properties/{property_id}", response_model=PropertyResponse)
-def get_property(property_id: int, db: Session = Depends(get_db)):
-    property = db.query(Property).filter(Property.id == property_id).first()
+async def get_property(
+    request: Request,
+    property_id: int,
+    fields: List[str] = Depends(sparse_fields(PropertyResponse)),
+    include: List[str] = Depends(includes(PROPERTY_INCLUDES)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if not include and cacheable(PropertyResponse, fields):
+        response = await entity_detail(db, Property, property_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Property not found")
+        return conditional(request, response)
+
+    def load(session):
+        query = session.query(Property).filter(Property.id == property_id)
+        if include:
+            property = apply_includes(query, PROPERTY_INCLUDES, include).first()
+            return property and render(property, PropertyResponse, PropertyWithIncludes, fields, include)
+        property = project(query, fields).first()
+        return property and property._asdict()
+
+    property = await db.run(load)
     if not property:
         raise HTTPException(status_code=404, detail="Property not found")
-    return property
+    return conditional(request, json_response(property))
 
 
 @router.post("/properties/", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
-def create_property(property: PropertyCreate, db: Session = Depends(get_db)):
-    db_property = Property(
-        title=property.title,
-        description=property.description,
-        property_type=property.property_type,
-        address=property.address,
-        city=property.city,
-        price=property.price,
-        bedrooms=property.bedrooms,
-        bathrooms=property.bathrooms,
-        area_sqft=property.area_sqft,
-        owner_id=property.owner_id,
-        agent_id=property.agent_id
-    )
-    db.add(db_property)
-    db.commit()
-    db.refresh(db_property)
-    return db_property
+async def create_property(property: PropertyCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Property, property.dict(), PropertyResponse)
+    await invalidate_rows(Property, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
+
+
+@router.post("/properties/bulk", response_model=BulkCreateResult[PropertyResponse], status_code=status.HTTP_201_CREATED)
+async def create_properties_bulk(rows: List[Dict[str, Any]], writer: WriteQueue = Depends(get_writer)):
+    return await bulk_create(writer, Property, PropertyCreate, PropertyResponse, rows)
 
 
 @router.put("/properties/{property_id}", response_model=PropertyResponse)
-def update_property(property_id: int, property_update: PropertyCreate, db: Session = Depends(get_db)):
-    property = db.query(Property).filter(Property.id == property_id).first()
+async def update_property(property_id: int, property_update: PropertyCreate, writer: WriteQueue = Depends(get_writer)):
+    property = await writer.call(update_row, Property, property_id, property_update.dict(), PropertyResponse)
     if not property:
         raise HTTPException(status_code=404, detail="Property not found")
-    
-    for key, value in property_update.dict().items():
-        setattr(property, key, value)
-    
-    db.commit()
-    db.refresh(property)
-    return property
+    await invalidate_rows(Property, property_id)
+    return json_response(property)
 
 
-@router.delete("/properties/{property_id}", status_code=status.HTTP_200_OK)
-def delete_property(property_id: int, db: Session = Depends(get_db)):
-    property = db.query(Property).filter(Property.id == property_id).first()
+@router.patch("/properties/{property_id}", response_model=PropertyResponse)
+async def patch_property(property_id: int, property_update: PropertyUpdate, writer: WriteQueue = Depends(get_writer)):
+    property = await writer.call(update_row, Property, property_id, property_update.dict(exclude_unset=True), PropertyResponse)
     if not property:
         raise HTTPException(status_code=404, detail="Property not found")
-    
-    db.delete(property)
-    db.commit()
+    await invalidate_rows(Property, property_id)
+    return json_response(property)
+
+
+@router.delete("/properties/", response_model=BulkDeleteResult)
+async def delete_properties(ids: List[int] = Depends(delete_ids), writer: WriteQueue = Depends(get_writer)):
+    result = await writer.call(delete_rows, Property, ids)
+    await invalidate_rows(Property, *result["deleted"], deleted=True)
+    return result
+
+
+@router.delete("/properties/{property_id}", status_code=status.HTTP_200_OK)
+async def delete_property(property_id: int, writer: WriteQueue = Depends(get_writer)):
+    if not await writer.call(delete_row, Property, property_id):
+        raise HTTPException(status_code=404, detail="Property not found")
+    await invalidate_rows(Property, property_id, deleted=True)
     return {"message": "Property deleted successfully"}
 
 
 # ========== PROPERTY IMAGE ENDPOINTS ==========
 
-@router.get("/property-images/", response_model=List[PropertyImageResponse])
-def get_property_images(db: Session = Depends(get_db)):
-    return db.query(PropertyImage).all()
+@router.get("/property-images/", response_model=Page[PropertyImageResponse])
+async def get_property_images(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(PropertyImageResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(PropertyImage), [PropertyImage.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(PropertyImage))
 
 
 @router.get("/property-images/{image_id}", response_model=PropertyImageResponse)
-def get_property_image(image_id: int, db: Session = Depends(get_db)):
-    image = db.query(PropertyImage).filter(PropertyImage.id == image_id).first()
+async def get_property_image(
+    request: Request,
+    image_id: int,
+    fields: List[str] = Depends(sparse_fields(PropertyImageResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(PropertyImageResponse, fields):
+        response = await entity_detail(db, PropertyImage, image_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Property image not found")
+        return conditional(request, response)
+    image = await db.run(lambda session: project(session.query(PropertyImage).filter(PropertyImage.id == image_id), fields).first())
     if not image:
         raise HTTPException(status_code=404, detail="Property image not found")
-    return image
+    return conditional(request, json_response(image._asdict()))
 
 
 @router.post("/property-images/", response_model=PropertyImageResponse, status_code=status.HTTP_201_CREATED)
-def create_property_image(image: PropertyImageCreate, db: Session = Depends(get_db)):
-    db_image = PropertyImage(
-        property_id=image.property_id,
-        image_url=image.image_url,
-        is_primary=image.is_primary
-    )
-    db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
-    return db_image
+async def create_property_image(image: PropertyImageCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, PropertyImage, image.dict(), PropertyImageResponse)
+    await invalidate_rows(PropertyImage, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
+
+
+@router.post("/property-images/bulk", response_model=BulkCreateResult[PropertyImageResponse], status_code=status.HTTP_201_CREATED)
+async def create_property_images_bulk(rows: List[Dict[str, Any]], writer: WriteQueue = Depends(get_writer)):
+    return await bulk_create(writer, PropertyImage, PropertyImageCreate, PropertyImageResponse, rows)
+
+
+@router.delete("/property-images/", response_model=BulkDeleteResult)
+async def delete_property_images(ids: List[int] = Depends(delete_ids), writer: WriteQueue = Depends(get_writer)):
+    result = await writer.call(delete_rows, PropertyImage, ids)
+    await invalidate_rows(PropertyImage, *result["deleted"], deleted=True)
+    return result
 
 
 @router.delete("/property-images/{image_id}", status_code=status.HTTP_200_OK)
-def delete_property_image(image_id: int, db: Session = Depends(get_db)):
-    image = db.query(PropertyImage).filter(PropertyImage.id == image_id).first()
-    if not image:
+async def delete_property_image(image_id: int, writer: WriteQueue = Depends(get_writer)):
+    if not await writer.call(delete_row, PropertyImage, image_id):
         raise HTTPException(status_code=404, detail="Property image not found")
-    
-    db.delete(image)
-    db.commit()
+    await invalidate_rows(PropertyImage, image_id, deleted=True)
     return {"message": "Property image deleted successfully"}
 
 
 # ========== LISTING ENDPOINTS ==========
 
-@router.get("/listings/", response_model=List[ListingResponse])
-def get_listings(db: Session = Depends(get_db)):
-    return db.query(Listing).all()
+@router.get("/listings/", response_model=Page[ListingResponse])
+async def get_listings(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(ListingResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(Listing), [Listing.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(Listing))
 
 
 @router.get("/listings/{listing_id}", response_model=ListingResponse)
-def get_listing(listing_id: int, db: Session = Depends(get_db)):
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+async def get_listing(
+    request: Request,
+    listing_id: int,
+    fields: List[str] = Depends(sparse_fields(ListingResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(ListingResponse, fields):
+        response = await entity_detail(db, Listing, listing_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Listing not found")
+        return conditional(request, response)
+    listing = await db.run(lambda session: project(session.query(Listing).filter(Listing.id == listing_id), fields).first())
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    return listing
+    return conditional(request, json_response(listing._asdict()))
 
 
 @router.post("/listings/", response_model=ListingResponse, status_code=status.HTTP_201_CREATED)
-def create_listing(listing: ListingCreate, db: Session = Depends(get_db)):
-    db_listing = Listing(
-        property_id=listing.property_id,
-        listing_type=listing.listing_type,
-        listed_price=listing.listed_price,
-        listing_date=listing.listing_date,
-        expiry_date=listing.expiry_date
-    )
-    db.add(db_listing)
-    db.commit()
-    db.refresh(db_listing)
-    return db_listing
+async def create_listing(listing: ListingCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Listing, listing.dict(), ListingResponse)
+    await invalidate_rows(Listing, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
+
+
+@router.post("/listings/bulk", response_model=BulkCreateResult[ListingResponse], status_code=status.HTTP_201_CREATED)
+async def create_listings_bulk(rows: List[Dict[str, Any]], writer: WriteQueue = Depends(get_writer)):
+    return await bulk_create(writer, Listing, ListingCreate, ListingResponse, rows)
 
 
 # ========== INQUIRY ENDPOINTS ==========
 
-@router.get("/inquiries/", response_model=List[InquiryResponse])
-def get_inquiries(db: Session = Depends(get_db)):
-    return db.query(Inquiry).all()
+@router.get("/inquiries/", response_model=Page[InquiryResponse])
+async def get_inquiries(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(InquiryResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(Inquiry), [Inquiry.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(Inquiry))
 
 
 @router.get("/inquiries/{inquiry_id}", response_model=InquiryResponse)
-def get_inquiry(inquiry_id: int, db: Session = Depends(get_db)):
-    inquiry = db.query(Inquiry).filter(Inquiry.id == inquiry_id).first()
+async def get_inquiry(
+    request: Request,
+    inquiry_id: int,
+    fields: List[str] = Depends(sparse_fields(InquiryResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(InquiryResponse, fields):
+        response = await entity_detail(db, Inquiry, inquiry_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Inquiry not found")
+        return conditional(request, response)
+    inquiry = await db.run(lambda session: project(session.query(Inquiry).filter(Inquiry.id == inquiry_id), fields).first())
     if not inquiry:
         raise HTTPException(status_code=404, detail="Inquiry not found")
-    return inquiry
+    return conditional(request, json_response(inquiry._asdict()))
 
 
 @router.post("/inquiries/", response_model=InquiryResponse, status_code=status.HTTP_201_CREATED)
-def create_inquiry(inquiry: InquiryCreate, db: Session = Depends(get_db)):
-    db_inquiry = Inquiry(
-        property_id=inquiry.property_id,
-        client_id=inquiry.client_id,
-        message=inquiry.message
-    )
-    db.add(db_inquiry)
-    db.commit()
-    db.refresh(db_inquiry)
-    return db_inquiry
+async def create_inquiry(inquiry: InquiryCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Inquiry, inquiry.dict(), InquiryResponse)
+    await invalidate_rows(Inquiry, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
 
 
 # ========== APPOINTMENT ENDPOINTS ==========
 
-@router.get("/appointments/", response_model=List[AppointmentResponse])
-def get_appointments(db: Session = Depends(get_db)):
-    return db.query(Appointment).all()
+@router.get("/appointments/", response_model=Page[AppointmentResponse])
+async def get_appointments(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(AppointmentResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(Appointment), [Appointment.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(Appointment))
 
 
 @router.get("/appointments/{appointment_id}", response_model=AppointmentResponse)
-def get_appointment(appointment_id: int, db: Session = Depends(get_db)):
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+async def get_appointment(
+    request: Request,
+    appointment_id: int,
+    fields: List[str] = Depends(sparse_fields(AppointmentResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(AppointmentResponse, fields):
+        response = await entity_detail(db, Appointment, appointment_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Appointment not found")
+        return conditional(request, response)
+    appointment = await db.run(lambda session: project(session.query(Appointment).filter(Appointment.id == appointment_id), fields).first())
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    return appointment
+    return conditional(request, json_response(appointment._asdict()))
 
 
 @router.post("/appointments/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
-def create_appointment(appointment: AppointmentCreate, db: Session = Depends(get_db)):
-    db_appointment = Appointment(
-        property_id=appointment.property_id,
-        agent_id=appointment.agent_id,
-        client_id=appointment.client_id,
-        appointment_date=appointment.appointment_date
-    )
-    db.add(db_appointment)
-    db.commit()
-    db.refresh(db_appointment)
-    return db_appointment
+async def create_appointment(appointment: AppointmentCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Appointment, appointment.dict(), AppointmentResponse)
+    await invalidate_rows(Appointment, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
 
 
 # ========== TRANSACTION ENDPOINTS ==========
 
-@router.get("/transactions/", response_model=List[TransactionResponse])
-def get_transactions(db: Session = Depends(get_db)):
-    return db.query(Transaction).all()
+@router.get("/transactions/", response_model=Page[TransactionResponse])
+async def get_transactions(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(TransactionResponse)),
+    include: List[str] = Depends(includes(TRANSACTION_INCLUDES)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+
+    def load(session):
+        query = session.query(Transaction)
+        if include:
+            # Payments, buyer, agent and property come through relationships;
+            # their rows change without the transaction's version, hence the body hash.
+            query = apply_includes(query, TRANSACTION_INCLUDES, include)
+            result = fetch_by_ids(query, ids) if ids else paginate(query, [Transaction.id], page)
+            result["items"] = [render(obj, TransactionResponse, TransactionWithIncludes, fields, include) for obj in result["items"]]
+            tags = response_tags(Transaction, include, result["items"])
+            return tagged(conditional(request, json_response(result)), db, tags)
+        return tagged(versioned_page(request, query, [Transaction.id], page, ids, fields), db, response_tags(Transaction))
+
+    return await db.run(load)
+
+
+def _transaction_balances(db: Session, transaction_ids):
+    paid = (
+        select(Payment.transaction_id, func.sum(Payment.amount).label("total_paid"))
+        .where(Payment.transaction_id.in_(transaction_ids))
+        .group_by(Payment.transaction_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Transaction.id, Transaction.sale_price, func.coalesce(paid.c.total_paid, 0))
+        .outerjoin(paid, paid.c.transaction_id == Transaction.id)
+        .where(Transaction.id.in_(transaction_ids))
+    ).all()
+
+    balances = {}
+    for transaction_id, sale_price, total_paid in rows:
+        sale_price = float(sale_price)
+        total_paid = float(total_paid)
+        balances[transaction_id] = {
+            "transaction_id": transaction_id,
+            "sale_price": sale_price,
+            "total_paid": total_paid,
+            "remaining_balance": sale_price - total_paid,
+            "percent_paid": total_paid / sale_price * 100 if sale_price else 0.0,
+        }
+    return [balances[i] for i in transaction_ids if i in balances]
+
+
+@router.get("/transactions/balances", response_model=List[TransactionBalance])
+async def get_transaction_balances(
+    ids: str = Query(..., description="Comma-separated transaction ids, e.g. a page of transactions"),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    return await db.run(_transaction_balances, parse_ids(ids))
 
 
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+async def get_transaction(
+    request: Request,
+    transaction_id: int,
+    fields: List[str] = Depends(sparse_fields(TransactionResponse)),
+    include: List[str] = Depends(includes(TRANSACTION_INCLUDES)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if not include and cacheable(TransactionResponse, fields):
+        response = await entity_detail(db, Transaction, transaction_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+        return conditional(request, response)
+
+    def load(session):
+        query = session.query(Transaction).filter(Transaction.id == transaction_id)
+        if include:
+            transaction = apply_includes(query, TRANSACTION_INCLUDES, include).first()
+            return transaction and render(transaction, TransactionResponse, TransactionWithIncludes, fields, include)
+        transaction = project(query, fields).first()
+        return transaction and transaction._asdict()
+
+    transaction = await db.run(load)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    return transaction
+    return conditional(request, json_response(transaction))
+
+
+@router.get("/transactions/{transaction_id}/balance", response_model=TransactionBalance)
+async def get_transaction_balance(transaction_id: int, db: AsyncDB = Depends(get_async_read_db)):
+    balances = await db.run(_transaction_balances, [transaction_id])
+    if not balances:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return balances[0]
 
 
 @router.post("/transactions/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
-    db_transaction = Transaction(
-        property_id=transaction.property_id,
-        agent_id=transaction.agent_id,
-        buyer_id=transaction.buyer_id,
-        sale_price=transaction.sale_price,
-        commission=transaction.commission,
-        transaction_date=transaction.transaction_date
-    )
-    db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+async def create_transaction(transaction: TransactionCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Transaction, transaction.dict(), TransactionResponse)
+    await invalidate_rows(Transaction, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
 
 
 # ========== PAYMENT ENDPOINTS ==========
 
-@router.get("/payments/", response_model=List[PaymentResponse])
-def get_payments(db: Session = Depends(get_db)):
-    return db.query(Payment).all()
+@router.get("/payments/", response_model=Page[PaymentResponse])
+async def get_payments(
+    request: Request,
+    page: PageParams = Depends(),
+    ids: Optional[List[int]] = Depends(id_list),
+    fields: List[str] = Depends(sparse_fields(PaymentResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    response = await db.run(
+        lambda session: versioned_page(request, session.query(Payment), [Payment.id], page, ids, fields)
+    )
+    return tagged(response, db, response_tags(Payment))
 
 
 @router.get("/payments/{payment_id}", response_model=PaymentResponse)
-def get_payment(payment_id: int, db: Session = Depends(get_db)):
-    payment = db.query(Payment).filter(Payment.id == payment_id).first()
+async def get_payment(
+    request: Request,
+    payment_id: int,
+    fields: List[str] = Depends(sparse_fields(PaymentResponse)),
+    db: AsyncDB = Depends(get_async_read_db),
+):
+    if cacheable(PaymentResponse, fields):
+        response = await entity_detail(db, Payment, payment_id, fields)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Payment not found")
+        return conditional(request, response)
+    payment = await db.run(lambda session: project(session.query(Payment).filter(Payment.id == payment_id), fields).first())
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
-    return payment
+    return conditional(request, json_response(payment._asdict()))
 
 
 @router.post("/payments/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
-def create_payment(payment: PaymentCreate, db: Session = Depends(get_db)):
-    db_payment = Payment(
-        transaction_id=payment.transaction_id,
-        amount=payment.amount,
-        payment_method=payment.payment_method
+async def create_payment(payment: PaymentCreate, writer: WriteQueue = Depends(get_writer)):
+    created = await writer.call(insert_row, Payment, payment.dict(), PaymentResponse)
+    await invalidate_rows(Payment, created["id"])
+    return json_response(created, status.HTTP_201_CREATED)
+
+
+@router.post("/payments/bulk", response_model=BulkCreateResult[PaymentResponse], status_code=status.HTTP_201_CREATED)
+async def create_payments_bulk(rows: List[Dict[str, Any]], writer: WriteQueue = Depends(get_writer)):
+    return await bulk_create(writer, Payment, PaymentCreate, PaymentResponse, rows)
+
+
+# ========== DASHBOARD ENDPOINTS ==========
+
+RECENT_ITEMS = 5
+
+
+@router.get("/dashboard/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(db: AsyncDB = Depends(get_async_read_db)):
+    def load(session):
+        # All counters come back from a single SELECT of scalar subqueries.
+        totals = session.execute(
+            select(
+                select(func.count()).select_from(Property).scalar_subquery().label("properties"),
+                select(func.count()).select_from(Client).scalar_subquery().label("clients"),
+                select(func.count()).select_from(Transaction).scalar_subquery().label("transactions"),
+                select(func.count()).select_from(Appointment).scalar_subquery().label("appointments"),
+                select(func.coalesce(func.sum(Transaction.sale_price), 0)).scalar_subquery().label("total_revenue"),
+            )
+        ).one()
+
+        recent_properties = (
+            session.query(Property)
+            .order_by(Property.created_at.desc(), Property.id.desc())
+            .limit(RECENT_ITEMS)
+            .all()
+        )
+        recent_transactions = (
+            session.query(Transaction)
+            .order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+            .limit(RECENT_ITEMS)
+            .all()
+        )
+
+        # Rendered while the session is still open.
+        return DashboardSummary.model_validate({
+            **totals._asdict(),
+            "recent_properties": recent_properties,
+            "recent_transactions": recent_transactions,
+        }).model_dump(mode="json")
+
+    return json_response(await db.run(load))
+
+
+# ========== EXPORT ENDPOINTS ==========
+
+@router.get("/export/{resource}")
+async def export_resource(
+    request: Request,
+    resource: str,
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    if resource not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export resource")
+    return StreamingResponse(
+        stream_export(resource, fmt, session_factory=read_sessionmaker(pinned(request))),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{fmt}"'},
     )
-    db.add(db_payment)
-    db.commit()
-    db.refresh(db_payment)
-    return db_payment
\ No newline at end of file
+
+
+# ========== IMPORT ENDPOINTS ==========
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@router.post("/imports/properties", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_properties(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    writer: WriteQueue = Depends(get_writer),
+):
+    # Spool the upload to disk so the import can outlive this request; the
+    # job is processed after the response is sent and polled via GET.
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(out.write, chunk)
+        job = await writer.call(insert_row, ImportJob, {"filename": file.filename}, ImportJobResponse)
+    except BaseException:
+        # No job will pick the file up.
+        os.remove(path)
+        raise
+    background_tasks.add_task(run_import, job["id"], path, delete_file=True, writer=writer)
+    return json_response(job, status.HTTP_202_ACCEPTED)
+
+
+@router.get("/imports/{job_id}", response_model=ImportJobResponse)
+async def get_import(job_id: int, db: AsyncDB = Depends(get_async_read_db)):
+    job = await db.run(lambda session: session.query(ImportJob).filter(ImportJob.id == job_id).first())
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.get("/imports/{job_id}/errors", response_model=Page[ImportRowErrorResponse])
+async def get_import_errors(job_id: int, page: PageParams = Depends(), db: AsyncDB = Depends(get_async_read_db)):
+    def load(session):
+        if session.query(ImportJob.id).filter(ImportJob.id == job_id).first() is None:
+            return None
+        return paginate(session.query(ImportRowError).filter(ImportRowError.job_id == job_id), [ImportRowError.id], page)
+
+    errors = await db.run(load)
+    if errors is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return errors
+
+
+# ========== METRICS ENDPOINTS ==========
+
+@router.get("/metrics")
+async def get_metrics():
+    # Counters are per worker process; scrape every worker to size the pool.
+    metrics = {"db_pool": pool_metrics.snapshot(), "db_read_pool": read_pool_metrics.snapshot()}
+    if settings.async_mode == "native":
+        metrics["db_async_read_pool"] = async_read_pool_metrics.snapshot()
+    if replica_pool_metrics:
+        metrics["db_replica_pools"] = [replica.snapshot() for replica in replica_pool_metrics]
+    if async_replica_pool_metrics:
+        metrics["db_async_replica_pools"] = [replica.snapshot() for replica in async_replica_pool_metrics]
+    metrics["entity_cache"] = entity_cache_metrics.snapshot()
+    metrics["entity_cache_local"] = fragments.snapshot()
+    metrics["response_cache"] = responses.snapshot()
+    return metrics
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.v1.cached import invalidate_rows
+from app.api.v1.serializers import json_response, select_columns
+
+MAX_BULK_ROWS = 1000
+
+
+def field_errors(exc: ValidationError) -> List[Dict[str, Any]]:
+    """Reduce a ValidationError to JSON-safe ``{loc, msg, type}`` entries."""
+    return [
+        {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+        for error in exc.errors(include_url=False, include_context=False)
+    ]
+
+
+def validate_rows(schema, rows: List[Dict[str, Any]]):
+    """Validate every row against ``schema``.
+
+    Returns ``(valid, errors)`` where ``valid`` holds ``(index, values)``
+    for the rows that passed and ``errors`` one report per rejected row,
+    both keyed by the row's position in the request.
+    """
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ROWS} rows per request")
+
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row).model_dump()))
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": field_errors(exc)})
+    return valid, errors
+
+
+def integrity_errors(exc: IntegrityError) -> List[Dict[str, Any]]:
+    """``field_errors`` for a row the database refused (foreign key, unique, ...)."""
+    return [{"loc": [], "msg": str(exc.orig), "type": "integrity_error"}]
+
+
+def bulk_insert(db: Session, model, response_schema, rows: List[Tuple[int, Dict[str, Any]]]):
+    """Insert ``rows`` (``(index, values)`` pairs) with INSERT ... RETURNING.
+
+    All rows go in one executemany first. The returned rows are dicts of
+    exactly the ``response_schema`` fields, in the same order as ``rows``,
+    so no follow-up SELECT is needed. If the database rejects that statement,
+    it is rolled back to a savepoint and the rows are retried one by one,
+    each in its own savepoint, so only the offending rows are left out.
+
+    Returns ``(created, errors)``, ``errors`` keyed by each row's index.
+    """
+    if not rows:
+        return [], []
+    statement = insert(model).returning(
+        *select_columns(model, list(response_schema.model_fields)), sort_by_parameter_order=True
+    )
+    try:
+        with db.begin_nested():
+            return [row._asdict() for row in db.execute(statement, [values for _, values in rows])], []
+    except IntegrityError:
+        pass
+
+    created, errors = [], []
+    for index, values in rows:
+        try:
+            with db.begin_nested():
+                created.append(db.execute(statement, [values]).one()._asdict())
+        except IntegrityError as exc:
+            errors.append({"index": index, "errors": integrity_errors(exc)})
+    return created, errors
+
+
+async def bulk_create(writer, model, create_schema, response_schema, rows: List[Dict[str, Any]]):
+    """Validate ``rows`` here, then insert the valid ones through ``writer``.
+
+    Answers 201 when every row was created and 207 (Multi-Status) when some
+    were rejected, with the report in the body either way.
+    """
+    valid, errors = validate_rows(create_schema, rows)
+    created, rejected = await writer.call(bulk_insert, model, response_schema, valid) if valid else ([], [])
+    await invalidate_rows(model, *(row["id"] for row in created))
+    errors = sorted(errors + rejected, key=lambda error: error["index"])
+    return json_response(
+        {"created": created, "errors": errors},
+        status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED,
+    )
@@ -0,0 +1,171 @@
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic_core import to_json
+from sqlalchemy import inspect
+
+from app.api.v1.conditional import VERSION_FIELDS, not_modified, page_etag
+from app.api.v1.fields import project
+from app.api.v1.pagination import PageParams, fetch_by_ids, paginate
+from app.cache.entities import entities
+from app.cache.fragments import fragments
+from app.cache.responses import SURROGATE_KEY, responses
+from app.database.database import AsyncDB, Base
+
+
+def cacheable(schema, fields: List[str]) -> bool:
+    """Whether a request asks for the full default representation of ``schema``.
+
+    Only that representation is cached; sparse fieldsets and includes are
+    rendered per request.
+    """
+    return fields == list(schema.model_fields)
+
+
+def rendered(query, ids: List[int], fields: List[str], row_versions: Optional[Dict[int, int]] = None) -> Dict[int, bytes]:
+    """JSON fragments for the rows of ``query`` with ``ids``.
+
+    Cached fragments are reused; the rest are read in one ``IN`` lookup,
+    rendered and cached. Ids with no row are left out. With
+    ``row_versions``, only fragments of those row versions are reused.
+    """
+    table = query.column_descriptions[0]["entity"].__tablename__
+    versions = fragments.versions(table, ids)
+    found = fragments.get_many(table, versions, row_versions)
+    missing = [i for i in ids if i not in found]
+    if missing:
+        # A lagging replica may still return a row the primary has since
+        # changed, so only primary reads fill the cache.
+        store = not query.session.info.get("replica")
+        for item in fetch_by_ids(query, missing, fields)["items"]:
+            fragment = to_json(item)
+            if store:
+                fragments.put(table, item["id"], versions[item["id"]], fragment, item.get("version"))
+            found[item["id"]] = fragment
+    return found
+
+
+def _collection(items: List[bytes], **extra) -> Response:
+    # {"items": [...], ...} spliced from the fragments without re-encoding them.
+    body = b'{"items":[' + b",".join(items) + b"]"
+    for key, value in extra.items():
+        body += b',"' + key.encode() + b'":' + to_json(value)
+    return Response(content=body + b"}", media_type="application/json")
+
+
+def cached_page(request: Request, query, keys, page: PageParams, fields: List[str], base_query) -> Response:
+    """``paginate`` assembled from cached fragments, as a conditional response.
+
+    The page itself is resolved on ids, versions and sort keys only, which
+    is enough for its ETag: an unchanged page is answered with a 304
+    without touching its rows. Otherwise rows are taken from the cache,
+    falling back to ``base_query`` for misses.
+    """
+    result = paginate(query, keys, page, VERSION_FIELDS)
+    etag = page_etag(request, result)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    row_versions = {item["id"]: item["version"] for item in result["items"]}
+    found = rendered(base_query, list(row_versions), fields, row_versions)
+    response = _collection([found[i] for i in row_versions if i in found], next_cursor=result["next_cursor"])
+    response.headers["ETag"] = etag
+    return response
+
+
+def cached_by_ids(request: Request, query, ids: List[int], fields: List[str], base_query=None) -> Response:
+    """``fetch_by_ids`` assembled from cached fragments, as a conditional response.
+
+    The ids are first matched against ``query`` on ids and versions alone,
+    so a cached row cannot bypass its filters, and the versions give the
+    ETag. Rows are then taken from the cache, falling back to
+    ``base_query`` (or ``query``) for misses.
+    """
+    result = fetch_by_ids(query, ids, VERSION_FIELDS)
+    etag = page_etag(request, result)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    row_versions = {item["id"]: item["version"] for item in result["items"]}
+    found = rendered(base_query if base_query is not None else query, list(row_versions), fields, row_versions)
+    response = _collection([found[i] for i in ids if i in found], missing=[i for i in ids if i not in found])
+    response.headers["ETag"] = etag
+    return response
+
+
+def _dependents(table: str) -> List[str]:
+    """Tables whose rows the database changes when ``table`` rows are deleted.
+
+    Follows ``ON DELETE CASCADE`` / ``SET NULL`` foreign keys, transitively.
+    """
+    found, pending = [], [table]
+    while pending:
+        parent = pending.pop()
+        for child in Base.metadata.sorted_tables:
+            if child.name in found or child.name == table:
+                continue
+            if any(fk.ondelete and fk.column.table.name == parent for fk in child.foreign_keys):
+                found.append(child.name)
+                pending.append(child.name)
+    return found
+
+
+async def entity_detail(db: AsyncDB, model, id: int, fields: List[str]) -> Optional[Response]:
+    """Row ``id`` of ``model`` as a response, read through the entity cache.
+
+    Returns ``None`` if there is no such row; that is cached as well.
+    """
+
+    def load(session):
+        row = project(session.query(model).filter(model.id == id), fields).first()
+        return to_json(row._asdict()) if row is not None else None
+
+    body = await entities.fetch(model.__tablename__, id, lambda: db.run(load), store=not db.replica)
+    return Response(content=body, media_type="application/json") if body is not None else None
+
+
+async def invalidate_rows(model, *ids: int, deleted: bool = False):
+    """Drop cached copies of ``model`` rows ``ids`` once their write has committed.
+
+    Creates call this too, to clear a cached 404 for the new id. After a
+    delete the cascaded tables are retired wholesale, since the rows the
+    database changed there are not known.
+    """
+    table = model.__tablename__
+    await entities.invalidate(table, *ids)
+    tags = [table, *(f"{table}:{i}" for i in ids)]
+    if deleted and ids:
+        dependents = _dependents(table)
+        await entities.invalidate_tables(*dependents)
+        tags.extend(dependents)
+    await responses.purge(*tags)
+
+
+def response_tags(model, include: Iterable[str] = (), items: Iterable[Dict] = ()) -> List[str]:
+    """Surrogate keys for a list of ``model`` rows with ``include`` relations.
+
+    The list is tagged with its table, since any write there can change
+    which rows it holds. Included collections add their table; included
+    single rows add ``table:id`` for each row shown.
+    """
+    tags = [model.__tablename__]
+    relationships = inspect(model).relationships
+    for name in include:
+        relationship = relationships[name]
+        related = relationship.mapper.local_table.name
+        if relationship.uselist:
+            tags.append(related)
+        else:
+            tags.extend(f"{related}:{item[name]['id']}" for item in items if item.get(name))
+    return list(dict.fromkeys(tags))
+
+
+def tagged(response: Response, db: AsyncDB, tags: Iterable[str]) -> Response:
+    """Mark ``response`` cacheable under ``tags`` (see ``app.cache.responses``).
+
+    Responses read from a replica may be stale and are left unmarked.
+    """
+    if not db.replica:
+        response.headers[SURROGATE_KEY] = " ".join(tags)
+    return response
@@ -0,0 +1,43 @@
+from typing import List, Optional
+
+from fastapi import HTTPException, Query
+
+from app.api.v1.serializers import select_columns
+
+
+def sparse_fields(schema):
+    """Build a ``fields=`` query dependency for ``schema``.
+
+    The dependency resolves to the requested field names, in request order,
+    or to every schema field when the parameter is absent. Only fields of the
+    response schema are accepted, so hidden columns can never be selected.
+    """
+    allowed = list(schema.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}"),
+    ) -> List[str]:
+        if fields is None:
+            return allowed
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown or not names:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}. Allowed: {', '.join(allowed)}",
+            )
+        return names
+
+    return dependency
+
+
+def project(query, fields: Optional[List[str]]):
+    """Narrow an ORM ``query`` to plain column rows for ``fields`` (no-op for ``None``).
+
+    The SELECT lists only those columns and rows come back as lightweight
+    ``Row`` tuples instead of hydrated entities.
+    """
+    if not fields:
+        return query
+    model = query.column_descriptions[0]["entity"]
+    return query.with_entities(*select_columns(model, fields))
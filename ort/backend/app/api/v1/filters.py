@@ -0,0 +1,98 @@
+import operator
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Query
+
+from app.api.v1.pagination import SortKey
+from app.models.models import Property
+
+# Filter name -> (column, comparison). Only these names reach SQL, and every
+# column here and in PROPERTY_SORTS leads one of the properties indexes
+# (see Property.__table_args__), so each filter is an index range and each
+# sort an index walk.
+PROPERTY_FILTERS = {
+    "min_price": (Property.price, operator.ge),
+    "max_price": (Property.price, operator.le),
+    "city": (Property.city, operator.eq),
+    "property_type": (Property.property_type, operator.eq),
+    "status": (Property.status, operator.eq),
+    "min_bedrooms": (Property.bedrooms, operator.ge),
+    "min_bathrooms": (Property.bathrooms, operator.ge),
+    "min_area_sqft": (Property.area_sqft, operator.ge),
+    "max_area_sqft": (Property.area_sqft, operator.le),
+}
+
+PROPERTY_SORTS = {
+    "price": Property.price,
+    "created_at": Property.created_at,
+    "bedrooms": Property.bedrooms,
+    "bathrooms": Property.bathrooms,
+    "area_sqft": Property.area_sqft,
+    "title": Property.title,
+}
+
+
+class PropertyFilterParams:
+    """Query parameters accepted by GET /properties/."""
+
+    def __init__(
+        self,
+        min_price: Optional[float] = Query(None, ge=0),
+        max_price: Optional[float] = Query(None, ge=0),
+        city: Optional[str] = Query(None, max_length=100),
+        property_type: Optional[str] = Query(None, pattern="^(house|apartment|land|commercial)$"),
+        status: Optional[str] = Query(None, pattern="^(available|sold|rented|pending)$"),
+        min_bedrooms: Optional[int] = Query(None, ge=0),
+        min_bathrooms: Optional[int] = Query(None, ge=0),
+        min_area_sqft: Optional[int] = Query(None, ge=0),
+        max_area_sqft: Optional[int] = Query(None, ge=0),
+        sort: Optional[str] = Query(
+            None,
+            description="Comma-separated sort keys, '-' prefix for descending (e.g. -price,created_at)",
+        ),
+    ):
+        self.filters = {
+            "min_price": min_price,
+            "max_price": max_price,
+            "city": city,
+            "property_type": property_type,
+            "status": status,
+            "min_bedrooms": min_bedrooms,
+            "min_bathrooms": min_bathrooms,
+            "min_area_sqft": min_area_sqft,
+            "max_area_sqft": max_area_sqft,
+        }
+        self.sort = sort
+
+
+def apply_filters(query, spec: Dict, values: Dict):
+    for name, value in values.items():
+        if value is None:
+            continue
+        column, compare = spec[name]
+        query = query.filter(compare(column, value))
+    return query
+
+
+def parse_sort(sort: Optional[str], sortable: Dict, tiebreaker) -> List[SortKey]:
+    """Turn ``-price,created_at`` into sort keys, always ending on ``tiebreaker``."""
+    keys = []
+    seen = set()
+    for token in (sort or "").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        descending = token.startswith("-")
+        name = token.lstrip("-")
+        if name not in sortable:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot sort by '{name}'. Allowed: {', '.join(sorted(sortable))}",
+            )
+        if name in seen:
+            continue
+        seen.add(name)
+        keys.append(SortKey(sortable[name], descending))
+    # Follow the direction of the first key so a plain index on it is usable.
+    keys.append(SortKey(tiebreaker, keys[0].descending if keys else False))
+    return keys
@@ -0,0 +1,59 @@
+from typing import Dict, List
+
+from fastapi import HTTPException, Query
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.models import Property, Transaction
+
+# include name -> loader option. Collections use selectinload (one extra
+# "WHERE parent_id IN (...)" query per relationship, whatever the page size);
+# many-to-one relations are joined into the main SELECT.
+PROPERTY_INCLUDES = {
+    "images": selectinload(Property.images),
+    "listings": selectinload(Property.listings),
+    "inquiries": selectinload(Property.inquiries),
+    "appointments": selectinload(Property.appointments),
+    "agent": joinedload(Property.agent),
+    "owner": joinedload(Property.owner),
+}
+
+TRANSACTION_INCLUDES = {
+    "payments": selectinload(Transaction.payments),
+    "buyer": joinedload(Transaction.buyer),
+    "agent": joinedload(Transaction.agent),
+    "property": joinedload(Transaction.property),
+}
+
+
+def includes(spec: Dict):
+    """Build an ``include=`` query dependency accepting the relations in ``spec``."""
+    allowed = list(spec)
+
+    def dependency(
+        include: str = Query("", description=f"Comma-separated related resources: {', '.join(allowed)}"),
+    ) -> List[str]:
+        names = list(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+        unknown = [name for name in names if name not in spec]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot include: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+            )
+        return names
+
+    return dependency
+
+
+def apply_includes(query, spec: Dict, names: List[str]):
+    return query.options(*[spec[name] for name in names]) if names else query
+
+
+def render(obj, base_schema, schema, fields: List[str], names: List[str]) -> dict:
+    """Serialize ``obj`` with ``schema``, keeping ``fields`` plus the ``names`` relations.
+
+    Relationships that were not requested are never read, so they are never
+    lazy-loaded and left out of the output.
+    """
+    data = {name: getattr(obj, name) for name in base_schema.model_fields}
+    data.update({name: getattr(obj, name) for name in names})
+    return schema.model_validate(data).model_dump(include={*fields, *names})
@@ -0,0 +1,180 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, false, or_
+
+from app.api.v1.fields import project
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_IDS = 1000
+# Ids bound per IN (...) list; keeps each statement well under SQLite's
+# bound-parameter limit (999 on older builds).
+ID_CHUNK_SIZE = 500
+
+
+class PageParams:
+    """Query parameters shared by every paginated collection endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def parse_ids(ids: str, limit: int = MAX_PAGE_SIZE) -> List[int]:
+    """Parse a comma-separated id list, keeping request order and dropping repeats."""
+    try:
+        values = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    values = list(dict.fromkeys(values))
+    if not values:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(values) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} ids per request")
+    return values
+
+
+def id_list(
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch instead of a page"),
+) -> Optional[List[int]]:
+    return parse_ids(ids, MAX_BATCH_IDS) if ids is not None else None
+
+
+def fetch_by_ids(query, ids: List[int], fields: Optional[List[str]] = None) -> dict:
+    """Fetch the rows of ``query`` with the given ids, in request order.
+
+    Ids are looked up with ``WHERE id IN (...)`` in chunks of
+    ``ID_CHUNK_SIZE``; ids with no matching row are returned under
+    ``missing``. With ``fields`` only those columns are selected and items
+    are plain dicts, otherwise items are the query's entities.
+    """
+    model = query.column_descriptions[0]["entity"]
+    if fields:
+        query = project(query, list(dict.fromkeys([*fields, "id"])))
+    found = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        for row in query.filter(model.id.in_(ids[start:start + ID_CHUNK_SIZE])):
+            found[row.id] = row
+    items = [found[i] for i in ids if i in found]
+    if fields:
+        items = [dict(zip(fields, row)) for row in items]
+    return {"items": items, "missing": [i for i in ids if i not in found]}
+
+
+class SortKey:
+    """A column a collection is ordered by.
+
+    NULLs always sort last, whichever the direction, so nullable columns
+    page the same way on SQLite and Postgres.
+    """
+
+    def __init__(self, column, descending: bool = False):
+        self.column = column
+        self.descending = descending
+        self.nullable = bool(getattr(column, "nullable", False))
+
+    @property
+    def name(self) -> str:
+        return ("-" if self.descending else "") + self.column.key
+
+    def order_by(self):
+        clause = self.column.desc() if self.descending else self.column.asc()
+        return clause.nulls_last() if self.nullable else clause
+
+    def after(self, value):
+        if value is None:
+            # Only other NULLs follow a NULL, and those tie on this key.
+            return false()
+        clause = self.column < value if self.descending else self.column > value
+        return or_(clause, self.column.is_(None)) if self.nullable else clause
+
+    def equal(self, value):
+        return self.column.is_(None) if value is None else self.column == value
+
+    def coerce(self, value):
+        if value is None:
+            return None
+        python_type = self.column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is Decimal:
+            # Projected DECIMAL columns are read as floats (see select_columns),
+            # so the cursor may hold 250000.1; go through its shortest repr
+            # rather than its exact binary value, which would not tie.
+            return Decimal(str(value))
+        return python_type(value)
+
+
+def _sort_keys(keys) -> List[SortKey]:
+    return [key if isinstance(key, SortKey) else SortKey(key) for key in keys]
+
+
+def encode_cursor(keys: Sequence[SortKey], values: Sequence[Any]) -> str:
+    payload = {"k": ",".join(key.name for key in keys), "v": list(values)}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        # A cursor only makes sense for the ordering that produced it.
+        if payload["k"] != ",".join(key.name for key in keys) or len(values) != len(keys):
+            raise ValueError
+        return [key.coerce(value) for key, value in zip(keys, values)]
+    except (ValueError, TypeError, KeyError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    # (k1, k2, ...) > (v1, v2, ...) spelled out so it works on every backend,
+    # honours per-key direction and lets the planner walk the sort index.
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [k.equal(v) for k, v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equal, key.after(values[i])))
+    return or_(*clauses)
+
+
+def paginate(query, keys, page: PageParams, fields: Optional[List[str]] = None) -> dict:
+    """Return one page of ``query`` ordered by ``keys``.
+
+    ``keys`` are columns (ascending) or ``SortKey`` instances. The last key
+    must be unique (normally the primary key) so the ordering is total and a
+    cursor always points at exactly one position.
+
+    With ``fields`` only those columns (plus the sort keys, for the cursor)
+    are selected and items are plain dicts of the requested fields.
+    """
+    keys = _sort_keys(keys)
+    if fields:
+        query = project(query, list(dict.fromkeys([*fields, *(key.column.key for key in keys)])))
+    if page.cursor is not None:
+        values = decode_cursor(page.cursor, keys)
+        query = query.filter(_after(keys, values))
+
+    rows = query.order_by(*[key.order_by() for key in keys]).limit(page.limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(keys, [getattr(last, key.column.key) for key in keys])
+
+    if fields:
+        # The requested fields lead the SELECT list, ahead of any extra keys.
+        rows = [dict(zip(fields, row)) for row in rows]
+    return {"items": rows, "next_cursor": next_cursor}
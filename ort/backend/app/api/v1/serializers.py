@@ -0,0 +1,32 @@
+from typing import List
+
+from fastapi.responses import Response
+from pydantic_core import to_json
+from sqlalchemy import Float, Numeric, cast
+
+
+def select_columns(model, names: List[str]):
+    """Columns to SELECT for the response fields ``names`` of ``model``.
+
+    DECIMAL columns are cast to float in SQL: the response schemas declare
+    them as ``float`` and this keeps the rows JSON-ready without a Python
+    conversion pass (``to_json`` would render a ``Decimal`` as a string).
+    """
+    columns = []
+    for name in names:
+        column = getattr(model, name)
+        if isinstance(column.type, Numeric) and column.type.asdecimal:
+            column = cast(column, Float).label(name)
+        columns.append(column)
+    return columns
+
+
+def json_response(content, status_code: int = 200) -> Response:
+    """Encode already-trusted data straight to JSON bytes.
+
+    Read endpoints build their payloads from database rows shaped like the
+    response schemas, so re-validating them through ``response_model`` would
+    only repeat work; ``to_json`` serializes dicts, lists, datetimes and
+    dates natively in one pass.
+    """
+    return Response(content=to_json(content), status_code=status_code, media_type="application/json")
@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.v1.pagination import ID_CHUNK_SIZE, parse_ids
+from app.api.v1.serializers import select_columns
+from app.database.database import Base
+
+MAX_DELETE_IDS = 10000
+
+# These helpers only execute statements; the caller owns the transaction,
+# normally the write queue (app.database.writer), which commits them in
+# groups. Integrity errors become a 409 and leave the transaction to the
+# caller to roll back.
+
+
+def _rejected(action: str, exc: IntegrityError) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"{action} rejected by the database: {exc.orig}")
+
+
+def insert_row(db: Session, model, values: Dict[str, Any], response_schema) -> Dict[str, Any]:
+    """Insert one row with ``INSERT ... RETURNING``.
+
+    Server defaults such as ``created_at`` come back in the same statement,
+    so the response is built from the returned row without a refresh.
+    """
+    columns = select_columns(model, list(response_schema.model_fields))
+    try:
+        row = db.execute(insert(model).values(**values).returning(*columns)).one()
+    except IntegrityError as exc:
+        raise _rejected("Insert", exc)
+    return row._asdict()
+
+
+def update_row(db: Session, model, row_id: int, values: Dict[str, Any], response_schema) -> Optional[Dict[str, Any]]:
+    """Apply ``values`` to one row with a single ``UPDATE ... RETURNING``.
+
+    Only the given columns are written. Returns the updated row shaped like
+    ``response_schema``, or ``None`` when no row has ``row_id``. An empty
+    ``values`` writes nothing and just reads the row back.
+    """
+    columns = select_columns(model, list(response_schema.model_fields))
+    if not values:
+        row = db.execute(select(*columns).where(model.id == row_id)).first()
+        return row._asdict() if row else None
+    statement = (
+        update(model)
+        .where(model.id == row_id)
+        .values(**values)
+        .returning(*columns)
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        row = db.execute(statement).first()
+    except IntegrityError as exc:
+        raise _rejected("Update", exc)
+    return row._asdict() if row else None
+
+
+def _touch_dependents(db: Session, table, ids):
+    """Bump the version of rows that deleting ``ids`` from ``table`` changes.
+
+    ``ON DELETE SET NULL`` rewrites referencing rows inside the database,
+    where the ``version`` column's update default never runs, so those
+    rows are bumped beforehand. Rows removed by ``ON DELETE CASCADE`` are
+    followed for their own referencing rows. ``ids`` is a list or a select.
+    """
+    for child in Base.metadata.sorted_tables:
+        for fk in child.foreign_keys:
+            if fk.column.table is not table or child is table:
+                continue
+            if fk.ondelete == "SET NULL" and "version" in child.c:
+                db.execute(update(child).where(fk.parent.in_(ids)).values(version=child.c.version + 1))
+            elif fk.ondelete == "CASCADE":
+                _touch_dependents(db, child, select(child.c.id).where(fk.parent.in_(ids)))
+
+
+def delete_row(db: Session, model, row_id: int) -> bool:
+    """Delete one row with ``DELETE ... RETURNING id``.
+
+    Dependent rows are handled by the schema's ON DELETE clauses, so nothing
+    is loaded first. Returns whether a row was deleted; a row that is still
+    referenced without ON DELETE raises a 409.
+    """
+    try:
+        _touch_dependents(db, model.__table__, [row_id])
+        deleted = db.execute(
+            delete(model).where(model.id == row_id).returning(model.id).execution_options(synchronize_session=False)
+        ).first()
+    except IntegrityError as exc:
+        raise _rejected("Delete", exc)
+    return deleted is not None
+
+
+def delete_ids(
+    ids: str = Query(..., description=f"Comma-separated ids to delete (at most {MAX_DELETE_IDS})"),
+) -> List[int]:
+    return parse_ids(ids, MAX_DELETE_IDS)
+
+
+def delete_rows(db: Session, model, ids: List[int]) -> dict:
+    """Delete the rows with ``ids``.
+
+    Each ``DELETE ... WHERE id IN (...) RETURNING id`` covers up to
+    ``ID_CHUNK_SIZE`` ids. Either every row goes or, if any is still
+    referenced, none does (409). Ids with no row are reported as missing.
+    """
+    deleted = set()
+    try:
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            _touch_dependents(db, model.__table__, chunk)
+            statement = (
+                delete(model)
+                .where(model.id.in_(chunk))
+                .returning(model.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted.update(db.execute(statement).scalars())
+    except IntegrityError as exc:
+        raise _rejected("Delete", exc)
+    return {"deleted": [i for i in ids if i in deleted], "missing": [i for i in ids if i not in deleted]}
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Callable, Dict, List
+
+import redis
+import redis.asyncio
+from redis.exceptions import RedisError
+
+from app.core.config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+# Channel the workers' invalidation messages travel on.
+CHANNEL = "ort:invalidate"
+# Seconds between attempts to resubscribe after the connection drops.
+RECONNECT_DELAY = 1.0
+
+Handler = Callable[[Dict], None]
+
+
+def new_origin() -> str:
+    """A unique id for a cache to stamp on the messages it publishes.
+
+    Every worker receives its own broadcasts too; comparing a message's
+    ``origin`` with its own tells a cache which ones it has already applied.
+    """
+    return uuid.uuid4().hex
+
+
+class MemoryBroker:
+    """In-process broker for tests and single-process development.
+
+    ``publish`` hands the message to every subscriber straight away, so
+    several caches sharing one broker behave like workers sharing Redis.
+    """
+
+    def __init__(self):
+        self._handlers: List[Handler] = []
+
+    def subscribe(self, handler: Handler):
+        self._handlers.append(handler)
+
+    def publish_sync(self, message: Dict):
+        for handler in list(self._handlers):
+            handler(message)
+
+    async def publish(self, message: Dict):
+        self.publish_sync(message)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class RedisBroker:
+    """Redis pub/sub between the worker processes.
+
+    ``start`` runs a listener task on the event loop that passes every
+    message to the subscribers. Whenever it (re)subscribes, subscribers get
+    ``{"flush": True}``: messages sent while it was away are lost, so
+    nothing cached locally can be trusted.
+    """
+
+    def __init__(self, url: str, timeout: float, channel: str = CHANNEL):
+        self.url = url
+        self.channel = channel
+        options = {"socket_timeout": timeout, "socket_connect_timeout": timeout}
+        self._client = redis.asyncio.Redis.from_url(url, **options)
+        self._sync_client = redis.Redis.from_url(url, **options)
+        # The listener blocks on reads, so only connecting is time-limited.
+        self._listen_client = redis.asyncio.Redis.from_url(url, socket_connect_timeout=timeout)
+        self._handlers: List[Handler] = []
+        self._task = None
+
+    def subscribe(self, handler: Handler):
+        self._handlers.append(handler)
+
+    def _dispatch(self, message: Dict):
+        for handler in list(self._handlers):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Invalidation handler failed")
+
+    def publish_sync(self, message: Dict):
+        self._sync_client.publish(self.channel, json.dumps(message))
+
+    async def publish(self, message: Dict):
+        await self._client.publish(self.channel, json.dumps(message))
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self._listen_client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._dispatch({"flush": True})
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._dispatch(json.loads(message["data"]))
+            except (RedisError, OSError):
+                logger.warning("Invalidation channel lost; resubscribing", exc_info=True)
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._listen_client.aclose()
+        await self._client.aclose()
+        self._sync_client.close()
+
+
+def create_broker(config: Settings = settings):
+    """Redis pub/sub when ``REDIS_URL`` is set, otherwise the in-process broker."""
+    if config.redis_url:
+        return RedisBroker(config.redis_url, config.redis_timeout)
+    return MemoryBroker()
+
+
+# Shared by the caches of this process, so they use one subscription.
+broker = create_broker()
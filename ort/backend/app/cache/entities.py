@@ -0,0 +1,334 @@
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio
+from redis.exceptions import RedisError
+
+from app.cache.broker import MemoryBroker, broker as default_broker, new_origin
+from app.cache.fragments import FragmentCache, fragments
+from app.cache.stampede import expired_early
+from app.core.config import Settings, settings
+from app.core.metrics import CacheMetrics, entity_cache_metrics
+
+logger = logging.getLogger(__name__)
+
+# Failures that make the cache step aside rather than fail the request.
+CACHE_ERRORS = (RedisError, OSError)
+
+# Keys held by the in-process backend before expired ones are swept out.
+MAX_MEMORY_KEYS = 100000
+
+
+class MemoryBackend:
+    """In-process stand-in for Redis, used when ``REDIS_URL`` is unset.
+
+    Implements the few commands the cache needs, with the same byte values
+    and expiry, so tests and single-process development behave like Redis.
+    """
+
+    def __init__(self, max_keys: int = MAX_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+
+    def _get(self, key: str, now: float) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= now:
+            del self._data[key]
+            return None
+        return item[0]
+
+    def _put(self, key: str, value: bytes, ttl: float, now: float):
+        self._data[key] = (value, now + ttl)
+        if len(self._data) > self.max_keys:
+            for stale in [k for k, (_, expires) in self._data.items() if expires <= now]:
+                del self._data[stale]
+            while len(self._data) > self.max_keys:
+                del self._data[next(iter(self._data))]
+
+    def mget_sync(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(key, now) for key in keys]
+
+    def set_sync(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._put(key, value, ttl, time.monotonic())
+
+    def incr_sync(self, keys: List[str], ttl: float):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._put(key, b"%d" % (int(self._get(key, now) or 0) + 1), ttl, now)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.mget_sync(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self.set_sync(key, value, ttl)
+
+    async def incr(self, keys: List[str], ttl: float):
+        self.incr_sync(keys, ttl)
+
+    async def close(self):
+        pass
+
+
+class RedisBackend:
+    """The cache commands on Redis.
+
+    Request handlers use the asyncio client; ``incr_sync`` is for code
+    running in worker threads, such as the CSV importer.
+    """
+
+    def __init__(self, url: str, timeout: float):
+        options = {"socket_timeout": timeout, "socket_connect_timeout": timeout}
+        self._client = redis.asyncio.Redis.from_url(url, **options)
+        self._sync_client = redis.Redis.from_url(url, **options)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def incr(self, keys: List[str], ttl: float):
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.pexpire(key, int(ttl * 1000))
+            await pipe.execute()
+
+    def incr_sync(self, keys: List[str], ttl: float):
+        with self._sync_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.pexpire(key, int(ttl * 1000))
+            pipe.execute()
+
+    async def close(self):
+        await self._client.aclose()
+        self._sync_client.close()
+
+
+class EntityCache:
+    """Two-tier read-through cache of rendered rows for the detail routes.
+
+    The first tier is ``local``, a ``FragmentCache`` in this process that
+    answers without a network hop. The second is ``backend``, shared by
+    every worker, where each row uses three keys::
+
+        {prefix}:e:{table}:{id}   the rendered JSON, behind the stamp it was read under,
+                                  its expiry and the seconds it took to load
+        {prefix}:v:{table}:{id}   the row's version, bumped by ``invalidate``
+        {prefix}:v:{table}        the table's version, bumped by ``invalidate_tables``
+
+    A shared lookup reads all three with one ``MGET`` and serves the entry
+    only if its stamp matches the current versions. Both tiers store what
+    was loaded under the versions read *before* loading, so a load that
+    races a write stores an entry that is already stale. Missing rows are
+    cached in the shared tier only, as empty entries that live
+    ``negative_ttl`` seconds; creating the row bumps its version. A shared
+    entry close to expiry is occasionally treated as a miss (see
+    ``expired_early``), so one worker reloads a hot row before every worker
+    misses it at once.
+
+    Invalidation bumps the shared versions, then the local ones, then tells
+    the other workers through ``broker``. In that order a worker that drops
+    its local copy can only refill it from the database or from a shared
+    entry that is already current.
+
+    If the backend fails, reads go to the database and the failure is
+    counted under ``errors``; a failed invalidation leaves entries until
+    their TTL runs out.
+    """
+
+    def __init__(
+        self,
+        backend,
+        ttl: float,
+        negative_ttl: float,
+        local: FragmentCache = fragments,
+        broker=None,
+        prefix: str = "ort",
+        metrics: CacheMetrics = entity_cache_metrics,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local = local
+        self.broker = broker if broker is not None else MemoryBroker()
+        self.prefix = prefix
+        self.metrics = metrics
+        # Versions must outlive every entry stamped with them; see fetch().
+        self.version_ttl = 2 * max(ttl, negative_ttl, 1)
+        self.origin = new_origin()
+        self.broker.subscribe(self._on_message)
+
+    def _row_keys(self, table: str, ids) -> List[str]:
+        return [f"{self.prefix}:v:{table}:{i}" for i in ids]
+
+    def _table_keys(self, tables) -> List[str]:
+        return [f"{self.prefix}:v:{table}" for table in tables]
+
+    async def fetch(
+        self,
+        table: str,
+        id: int,
+        load: Callable[[], Awaitable[Optional[bytes]]],
+        store: bool = True,
+    ) -> Optional[bytes]:
+        """The cached JSON of row ``id``, or ``await load()`` on a miss.
+
+        ``load`` returns the rendered row or ``None`` if there is none.
+        With ``store=False`` (e.g. a read from a lagging replica) a miss is
+        not written back.
+        """
+        if self.ttl <= 0:
+            return await load()
+        local_versions = self.local.versions(table, [id])
+        body = self.local.get_many(table, local_versions).get(id)
+        if body is not None:
+            self.metrics.observe(table, "local_hits")
+            return body
+
+        key = f"{self.prefix}:e:{table}:{id}"
+        try:
+            table_version, row_version, entry = await self.backend.mget(
+                [*self._table_keys([table]), *self._row_keys(table, [id]), key]
+            )
+        except CACHE_ERRORS:
+            logger.warning("Entity cache read failed for %s %s", table, id, exc_info=True)
+            self.metrics.observe(table, "errors")
+            return await load()
+
+        stamp = b"%s.%s|" % (table_version or b"0", row_version or b"0")
+        cached = _parse_entry(entry, stamp)
+        if cached is not None:
+            expires, delta, body = cached
+            if not expired_early(expires, delta, time.time()):
+                self.metrics.observe(table, "hits" if body else "negative_hits")
+                if body:
+                    self.local.put(table, id, local_versions[id], body)
+                return body or None
+            self.metrics.observe(table, "early_refreshes")
+        else:
+            self.metrics.observe(table, "misses")
+
+        started = time.monotonic()
+        body = await load()
+        delta = time.monotonic() - started
+        if not store:
+            return body
+        if body is not None:
+            self.local.put(table, id, local_versions[id], body)
+        if body is not None or self.negative_ttl > 0:
+            ttl = self.ttl if body is not None else self.negative_ttl
+            try:
+                await self.backend.set(key, b"%s%.3f %.6f|%s" % (stamp, time.time() + ttl, delta, body or b""), ttl)
+            except CACHE_ERRORS:
+                logger.warning("Entity cache write failed for %s %s", table, id, exc_info=True)
+                self.metrics.observe(table, "errors")
+        return body
+
+    async def invalidate(self, table: str, *ids: int):
+        """Retire the cached entries of rows ``ids``; call after the write commits."""
+        if not ids:
+            return
+        await self._bump(self._row_keys(table, ids))
+        self.local.invalidate(table, *ids)
+        await self._publish({"table": table, "ids": list(ids)})
+
+    async def invalidate_tables(self, *tables: str):
+        """Retire every cached entry of ``tables``, e.g. after a cascading delete."""
+        if not tables:
+            return
+        await self._bump(self._table_keys(tables))
+        self.local.invalidate_tables(*tables)
+        await self._publish({"tables": list(tables)})
+
+    def invalidate_sync(self, table: str, *ids: int):
+        """``invalidate`` for code running outside the event loop."""
+        if not ids:
+            return
+        self._bump_sync(self._row_keys(table, ids))
+        self.local.invalidate(table, *ids)
+        self._publish_sync({"table": table, "ids": list(ids)})
+
+    def invalidate_tables_sync(self, *tables: str):
+        """``invalidate_tables`` for code running outside the event loop."""
+        if not tables:
+            return
+        self._bump_sync(self._table_keys(tables))
+        self.local.invalidate_tables(*tables)
+        self._publish_sync({"tables": list(tables)})
+
+    def _on_message(self, message: Dict):
+        if message.get("flush"):
+            self.local.clear()
+        elif message.get("origin") == self.origin:
+            return
+        elif "ids" in message:
+            self.local.invalidate(message["table"], *message["ids"])
+        elif "tables" in message:
+            self.local.invalidate_tables(*message["tables"])
+
+    async def _bump(self, keys: List[str]):
+        try:
+            await self.backend.incr(keys, self.version_ttl)
+        except CACHE_ERRORS:
+            logger.exception("Entity cache invalidation failed for %s", ", ".join(keys))
+
+    def _bump_sync(self, keys: List[str]):
+        try:
+            self.backend.incr_sync(keys, self.version_ttl)
+        except CACHE_ERRORS:
+            logger.exception("Entity cache invalidation failed for %s", ", ".join(keys))
+
+    async def _publish(self, message: Dict):
+        try:
+            await self.broker.publish({**message, "origin": self.origin})
+        except CACHE_ERRORS:
+            logger.exception("Broadcasting invalidation failed: %s", message)
+
+    def _publish_sync(self, message: Dict):
+        try:
+            self.broker.publish_sync({**message, "origin": self.origin})
+        except CACHE_ERRORS:
+            logger.exception("Broadcasting invalidation failed: %s", message)
+
+    async def close(self):
+        await self.backend.close()
+
+
+def _parse_entry(entry: Optional[bytes], stamp: bytes) -> Optional[Tuple[float, float, bytes]]:
+    """``(expires, delta, body)`` of a shared entry written under ``stamp``."""
+    if entry is None or not entry.startswith(stamp):
+        return None
+    meta, _, body = entry[len(stamp):].partition(b"|")
+    try:
+        expires, delta = meta.split()
+        return float(expires), float(delta), body
+    except ValueError:
+        # Written in an older format; reload it.
+        return None
+
+
+def create_backend(config: Settings = settings):
+    """Redis when ``REDIS_URL`` is set, otherwise the in-process backend."""
+    if config.redis_url:
+        return RedisBackend(config.redis_url, config.redis_timeout)
+    return MemoryBackend()
+
+
+entities = EntityCache(
+    create_backend(),
+    settings.entity_cache_ttl,
+    settings.entity_cache_negative_ttl,
+    broker=default_broker,
+)
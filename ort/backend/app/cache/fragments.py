@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+# Bytes charged per entry on top of the fragment itself: the key tuple and
+# the OrderedDict node.
+ENTRY_OVERHEAD = 200
+
+
+class FragmentCache:
+    """Pre-rendered JSON bytes for single rows, keyed by ``(table, id)``.
+
+    ``invalidate`` drops the fragment of each id, ``invalidate_tables``
+    those of whole tables and ``clear`` everything. Readers take a version
+    from ``versions`` *before* reading the rows and hand it back to ``put``,
+    which refuses the fragment if the row or its table was invalidated
+    since: a render that races a write is never stored.
+
+    Versions are ticks of one clock that every invalidation advances, and
+    each invalidated id remembers its tick. Those ticks only matter to
+    renders still in flight, so at most as many are kept as the cache has
+    room for entries; forgetting the oldest one raises a floor below which
+    ``put`` refuses everything instead.
+
+    Entries are evicted least recently used first once they take more than
+    ``max_bytes``, and expire ``ttl`` seconds after being stored (0 keeps
+    them until evicted). All of this lives in this process; the entity
+    cache broadcasts invalidations so every worker applies them.
+
+    A fragment may also record the ``version`` column of the row it was
+    rendered from. Callers that have just read that column pass it to
+    ``get_many`` and only get fragments rendered from the same row version,
+    which keeps a body in step with an ETag computed from those versions
+    even before an invalidation has arrived.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = 0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.max_invalidations = max(1, max_bytes // ENTRY_OVERHEAD)
+        self._lock = threading.Lock()
+        self._clock = 0
+        self._floor = 0
+        self._table_invalidated: Dict[str, int] = {}
+        self._invalidated: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        self._fragments: "OrderedDict[Tuple[str, int], Tuple[bytes, float, Optional[int]]]" = OrderedDict()
+
+    def versions(self, table: str, ids: Iterable[int]) -> Dict[int, int]:
+        with self._lock:
+            return {i: self._clock for i in ids}
+
+    def get_many(
+        self,
+        table: str,
+        versions: Dict[int, int],
+        row_versions: Optional[Dict[int, int]] = None,
+    ) -> Dict[int, bytes]:
+        """Fragments for each id in ``versions`` and, if given, whose row
+        version matches ``row_versions``."""
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for i in versions:
+                key = (table, i)
+                entry = self._fragments.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    self._drop(key)
+                    continue
+                if row_versions is not None and entry[2] != row_versions.get(i):
+                    continue
+                self._fragments.move_to_end(key)
+                found[i] = entry[0]
+        return found
+
+    def put(self, table: str, id: int, version: int, fragment: bytes, row_version: Optional[int] = None):
+        with self._lock:
+            key = (table, id)
+            if version < max(self._floor, self._table_invalidated.get(table, 0), self._invalidated.get(key, 0)):
+                return
+            self._drop(key)
+            expires = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+            self._fragments[key] = (fragment, expires, row_version)
+            self.size += len(fragment) + ENTRY_OVERHEAD
+            while self.size > self.max_bytes and self._fragments:
+                self._drop(next(iter(self._fragments)))
+
+    def _drop(self, key):
+        entry = self._fragments.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0]) + ENTRY_OVERHEAD
+
+    def invalidate(self, table: str, *ids: int):
+        """Drop the fragment of each id and refuse renders started before now."""
+        with self._lock:
+            self._clock += 1
+            for i in ids:
+                key = (table, i)
+                self._drop(key)
+                self._invalidated.pop(key, None)
+                self._invalidated[key] = self._clock
+            while len(self._invalidated) > self.max_invalidations:
+                _, tick = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, tick)
+
+    def invalidate_tables(self, *tables: str):
+        """Drop every fragment of whole tables and refuse their renders started before now."""
+        with self._lock:
+            self._clock += 1
+            for table in tables:
+                self._table_invalidated[table] = self._clock
+            for key in [key for key in self._fragments if key[0] in tables]:
+                self._drop(key)
+            # The table's tick covers these now.
+            for key in [key for key in self._invalidated if key[0] in tables]:
+                del self._invalidated[key]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._fragments),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "invalidations": len(self._invalidated),
+            }
+
+    def clear(self, table: Optional[str] = None):
+        if table is not None:
+            self.invalidate_tables(table)
+            return
+        with self._lock:
+            self._clock += 1
+            self._floor = self._clock
+            self._invalidated.clear()
+            self._table_invalidated.clear()
+            self._fragments.clear()
+            self.size = 0
+
+
+fragments = FragmentCache(settings.entity_cache_local_bytes, settings.entity_cache_local_ttl)
@@ -0,0 +1,354 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+
+from app.cache.broker import broker as default_broker, new_origin
+from app.cache.stampede import expired_early
+from app.core.config import settings
+from app.database.routing import pinned
+
+logger = logging.getLogger(__name__)
+
+# Header a route sets to make its response cacheable: space-separated tags
+# naming what the response shows, e.g. "properties users:3". Reverse
+# proxies that purge by surrogate key (Fastly, Varnish xkey) read it too.
+SURROGATE_KEY = "Surrogate-Key"
+
+# Bytes charged per entry on top of the body: key, headers and tag index.
+ENTRY_OVERHEAD = 500
+# Larger responses are passed through without being stored.
+MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    tags: Tuple[str, ...]
+    stored_at: float
+    expires: float
+    # Seconds it took to produce, which paces its early refresh.
+    delta: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + ENTRY_OVERHEAD
+
+
+def cache_key(scope) -> str:
+    """``path?query`` with parameters ordered by name, so ``?b=1&a=2`` and
+    ``?a=2&b=1`` share an entry. Repeated parameters keep their order."""
+    params = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+    query = urlencode(sorted(params, key=lambda param: param[0]))
+    return f"{scope['path']}?{query}" if query else scope["path"]
+
+
+def none_match(header: Optional[str], etag: Optional[str]) -> bool:
+    """Whether the ``If-None-Match`` value ``header`` names ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+    """
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+# Left out of a 304, which describes the response it stands in for.
+BODY_HEADERS = {b"content-length", b"content-type"}
+
+
+class ResponseCache:
+    """Cached GET responses of this process, indexed by surrogate key.
+
+    ``purge(*tags)`` drops every response carrying any of ``tags`` here and,
+    through ``broker``, in every other worker. Entries are evicted least
+    recently used first beyond ``max_bytes`` and expire after ``ttl``
+    seconds, a backstop for purges lost in transit.
+
+    ``purges`` counts purges applied in this process. A response is only
+    stored if none happened while it was being produced, since it may have
+    been read before the write that caused it.
+
+    As an entry nears expiry, ``get`` occasionally reports a miss while it
+    is still valid (see ``expired_early``), so a single request refreshes a
+    hot entry while the rest are served from it.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, broker=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.purges = 0
+        self.hits = 0
+        self.misses = 0
+        self.early_refreshes = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self.broker = broker
+        self.origin = new_origin()
+        if broker is not None:
+            broker.subscribe(self._on_message)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            now = time.monotonic()
+            if entry.expires <= now:
+                self._drop(key)
+                return None
+            if expired_early(entry.expires, entry.delta, now):
+                self.early_refreshes += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedResponse, purges: int) -> bool:
+        """Store ``entry`` unless a purge has been applied since ``purges`` was read."""
+        with self._lock:
+            # Only cacheable responses get here, so this counts real misses.
+            self.misses += 1
+            if self.purges != purges or entry.size > min(self.max_bytes, MAX_ENTRY_BYTES):
+                return False
+            self._drop(key)
+            self._entries[key] = entry
+            self.size += entry.size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+            return True
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def purge_local(self, *tags: str):
+        with self._lock:
+            self.purges += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self.purges += 1
+            self._entries.clear()
+            self._tags.clear()
+            self.size = 0
+
+    async def purge(self, *tags: str):
+        """Drop the responses tagged with any of ``tags``, in every worker."""
+        self.purge_local(*tags)
+        if self.broker is not None:
+            try:
+                await self.broker.publish({"purge": list(tags), "origin": self.origin})
+            except (RedisError, OSError):
+                logger.exception("Broadcasting purge failed: %s", tags)
+
+    def purge_sync(self, *tags: str):
+        """``purge`` for code running outside the event loop."""
+        self.purge_local(*tags)
+        if self.broker is not None:
+            try:
+                self.broker.publish_sync({"purge": list(tags), "origin": self.origin})
+            except (RedisError, OSError):
+                logger.exception("Broadcasting purge failed: %s", tags)
+
+    def _on_message(self, message: Dict):
+        if message.get("flush"):
+            self.clear()
+        elif "purge" in message and message.get("origin") != self.origin:
+            self.purge_local(*message["purge"])
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "early_refreshes": self.early_refreshes,
+                "coalesced": self.coalesced,
+                "purges": self.purges,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class Flight(NamedTuple):
+    """A GET being produced, which identical requests may wait for."""
+
+    purges: int
+    result: "asyncio.Future[Optional[CachedResponse]]"
+
+
+class ResponseCacheMiddleware:
+    """Serves GET responses from ``cache`` and fills it.
+
+    Only successful responses carrying a ``Surrogate-Key`` header are
+    stored. They are sent with ``Cache-Control: s-maxage=shared_max_age``
+    so a shared proxy may keep them briefly, and with ``max-age=0`` so
+    browsers revalidate. Hits carry ``Age`` and ``X-Cache: HIT``, and are
+    answered with a 304 when ``If-None-Match`` names their ``ETag``.
+
+    With ``coalesce``, a GET that misses while an identical one (same
+    normalized path and query, same primary pinning) is being produced
+    waits for it and replays its response with ``X-Cache: COALESCED``,
+    so a burst of misses costs one query and one serialization. It only
+    joins if no purge has been applied since the first one started, and
+    runs on its own if that one fails or streams more than
+    ``MAX_ENTRY_BYTES``. Streamed responses (no ``Content-Length``, e.g.
+    exports) are passed through as they come, never held in memory, and
+    paths under a ``bypass`` prefix skip the middleware altogether. Coalescing is per worker, and also works with
+    the cache itself turned off.
+    """
+
+    def __init__(
+        self,
+        app,
+        cache: "ResponseCache" = None,
+        shared_max_age: int = settings.response_cache_shared_max_age,
+        coalesce: bool = settings.coalesce_reads,
+        bypass: Tuple[str, ...] = (),
+    ):
+        self.app = app
+        self.cache = cache if cache is not None else responses
+        self.cache_control = f"public, max-age=0, s-maxage={shared_max_age}"
+        self.coalesce = coalesce
+        self.bypass = tuple(bypass)
+        self.flights: Dict[Tuple[str, bool], Flight] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"].startswith(self.bypass):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = str(int(time.time() - entry.stored_at)).encode()
+            await self._replay(send, entry, if_none_match, (b"age", age), (b"x-cache", b"HIT"))
+            return
+
+        if not self.coalesce:
+            await self._produce(scope, receive, send, key, None)
+            return
+
+        flight_key = (key, pinned(Request(scope)))
+        flight = self.flights.get(flight_key)
+        if flight is not None and flight.purges == self.cache.purges:
+            # Shielded: a follower that disconnects must not cancel the result.
+            shared = await asyncio.shield(flight.result)
+            if shared is not None:
+                self.cache.coalesced += 1
+                await self._replay(send, shared, if_none_match, (b"x-cache", b"COALESCED"))
+                return
+
+        flight = Flight(self.cache.purges, asyncio.get_running_loop().create_future())
+        self.flights[flight_key] = flight
+        try:
+            await self._produce(scope, receive, send, key, flight)
+        finally:
+            if self.flights.get(flight_key) is flight:
+                del self.flights[flight_key]
+            if not flight.result.done():
+                flight.result.set_result(None)
+
+    @staticmethod
+    async def _replay(send, entry: CachedResponse, if_none_match: Optional[str], *extra_headers):
+        headers = [*entry.headers, *extra_headers]
+        etag = next((value.decode("latin-1") for name, value in entry.headers if name == b"etag"), None)
+        if entry.status == 200 and none_match(if_none_match, etag):
+            headers = [(name, value) for name, value in headers if name not in BODY_HEADERS]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def _produce(self, scope, receive, send, key: str, flight: Optional[Flight]):
+        """Run the app, storing its response if cacheable and handing it to
+        the requests waiting on ``flight``."""
+        purges = self.cache.purges
+        started = time.monotonic()
+        response = {}
+        chunks = []
+        size = 0
+
+        def share(entry: Optional[CachedResponse]):
+            if flight is not None and not flight.result.done():
+                flight.result.set_result(entry)
+
+        async def send_capturing(message):
+            nonlocal size
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                tags = headers.get(SURROGATE_KEY)
+                streamed = "content-length" not in headers
+                # With the cache off (``max_bytes`` 0) nothing is stored, so
+                # nothing is advertised to shared proxies either.
+                cacheable = not streamed and self.cache.max_bytes > 0 and message["status"] == 200 and bool(tags)
+                if cacheable:
+                    headers["Cache-Control"] = self.cache_control
+                # Server errors may be transient, so waiters retry themselves;
+                # a 304 only answers this request's If-None-Match.
+                if cacheable or (flight is not None and not streamed and message["status"] < 500 and message["status"] != 304):
+                    response.update(
+                        status=message["status"],
+                        headers=list(message["headers"]),
+                        tags=tuple(tags.split()) if cacheable else (),
+                    )
+                else:
+                    share(None)
+                if cacheable:
+                    headers["X-Cache"] = "MISS"
+            elif message["type"] == "http.response.body" and response:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > MAX_ENTRY_BYTES:
+                    response.clear()
+                    chunks.clear()
+                    share(None)
+                else:
+                    chunks.append(body)
+                    if not message.get("more_body", False):
+                        now = time.monotonic()
+                        entry = CachedResponse(
+                            response["status"], response["headers"], b"".join(chunks), response["tags"],
+                            time.time(), now + self.cache.ttl, now - started,
+                        )
+                        stored = bool(entry.tags) and self.cache.put(key, entry, purges)
+                        # Shared only if no write landed while it was read.
+                        share(entry if stored or self.cache.purges == purges else None)
+            await send(message)
+
+        await self.app(scope, receive, send_capturing)
+
+
+responses = ResponseCache(settings.response_cache_bytes, settings.response_cache_ttl, default_broker)
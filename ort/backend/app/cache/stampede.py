@@ -0,0 +1,17 @@
+import math
+import random
+
+from app.core.config import settings
+
+
+def expired_early(expires: float, delta: float, now: float, beta: float = settings.cache_early_expiry_beta) -> bool:
+    """Whether to treat an entry as expired ahead of ``expires``.
+
+    Probabilistic early expiration ("XFetch"): each reader draws a random
+    head start proportional to ``delta``, the seconds the entry took to
+    compute. The closer the entry is to expiring and the slower it is to
+    rebuild, the likelier one reader refreshes it while everyone else is
+    still served, instead of all readers missing together at ``expires``.
+    ``beta`` > 1 refreshes earlier, 0 turns it off.
+    """
+    return now - delta * beta * math.log(1.0 - random.random()) >= expires
@@ -0,0 +1,134 @@
+from typing import List, Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
+
+# Async drivers named in DATABASE_URL and the sync driver the engine uses
+# for the same database.
+SYNC_DRIVERS = {
+    "postgresql+asyncpg": "postgresql+psycopg2",
+    "sqlite+aiosqlite": "sqlite",
+}
+# And the other way round, for the async engine.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def sync_url(database_url: str) -> str:
+    """``database_url`` on the sync driver for the same database."""
+    url = make_url(database_url)
+    if url.drivername in SYNC_DRIVERS:
+        url = url.set(drivername=SYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+def async_url(database_url: str) -> str:
+    """``database_url`` on the async driver for the same database."""
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+class Settings(BaseSettings):
+    """Runtime configuration, read from the environment (and ``.env``).
+
+    Every field maps to the upper-cased environment variable of the same
+    name, e.g. ``DB_POOL_SIZE=20``.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    database_url: str = "sqlite:///./real_estate.db"
+    # Connections kept open per worker process, and how many more may be
+    # opened under load before requests queue for one.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Seconds a request waits for a pooled connection before failing.
+    db_pool_timeout: float = 30.0
+    # Seconds after which a connection is replaced; -1 keeps them forever.
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Per-statement limit in milliseconds, 0 for none (PostgreSQL only).
+    db_statement_timeout_ms: int = 0
+    db_echo: bool = False
+    # How async routes read: "native" through an async engine (asyncpg,
+    # aiosqlite), "threadpool" by running the sync engine in worker threads.
+    # Unset means native when DATABASE_URL names an async driver.
+    db_async_mode: Optional[Literal["native", "threadpool"]] = None
+    # Pool for the read-only engine that serves GET routes.
+    db_read_pool_size: int = 10
+    # Read replicas for GET routes, used in turn, e.g.
+    # DB_REPLICA_URLS='["postgresql://replica-1/ort"]'. Empty reads from the
+    # primary. Each replica gets a read-only engine like the primary's.
+    db_replica_urls: List[str] = []
+    # Seconds after a write during which that client reads from the primary,
+    # so it sees its own changes despite replica lag. 0 disables pinning.
+    read_your_writes_seconds: float = 5.0
+
+    # SQLite profile, applied to every new connection. WAL lets readers run
+    # alongside the single writer; NORMAL sync is durable in WAL mode except
+    # across power loss. Sizes are in bytes, cache_size < 0 is in KiB.
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64 * 1024
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    # Milliseconds a connection waits for a lock held by another writer.
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Group commit: writes arriving within this many milliseconds of the
+    # first queued one share a transaction, up to write_batch_max_size.
+    write_batch_window_ms: float = 1.0
+    write_batch_max_size: int = 100
+    # Seconds a request waits for its queued write before giving up.
+    write_timeout: float = 30.0
+
+    # Shared cache for the detail routes; without REDIS_URL it is kept in
+    # process. Seconds a Redis call may take before the cache is bypassed.
+    redis_url: Optional[str] = None
+    redis_timeout: float = 0.1
+    # Seconds a cached row, and a cached 404, is served; 0 turns caching off.
+    entity_cache_ttl: int = 300
+    entity_cache_negative_ttl: int = 30
+    # In-process tier in front of it: its memory budget in bytes, and the
+    # seconds an entry may be served without a change being heard of, as a
+    # backstop for invalidation messages lost while Redis was unreachable.
+    entity_cache_local_bytes: int = 64 * 1024 * 1024
+    entity_cache_local_ttl: float = 30.0
+    # Response cache for list endpoints, per worker: its memory budget in
+    # bytes (0 turns it off), the seconds an entry is kept unless a write
+    # purges it first, and the s-maxage that lets a reverse proxy share
+    # responses for a few seconds.
+    response_cache_bytes: int = 64 * 1024 * 1024
+    response_cache_ttl: float = 60.0
+    response_cache_shared_max_age: int = 5
+    # Identical GETs in flight at once in a worker share one execution.
+    coalesce_reads: bool = True
+    # How eagerly cached entries are refreshed before they expire, so one
+    # reader rebuilds a hot entry instead of all of them at once; 0 turns
+    # early refreshes off, larger values start them sooner.
+    cache_early_expiry_beta: float = 1.0
+
+    backend_cors_origins: List[str] = ["http://localhost:3000"]
+
+    @property
+    def async_mode(self) -> str:
+        if self.db_async_mode is not None:
+            return self.db_async_mode
+        return "native" if make_url(self.database_url).drivername in SYNC_DRIVERS else "threadpool"
+
+    @property
+    def async_database_url(self) -> str:
+        return async_url(self.database_url)
+
+    @property
+    def sync_database_url(self) -> str:
+        return sync_url(self.database_url)
+
+
+settings = Settings()
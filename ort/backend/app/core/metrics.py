@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """Connection pool checkout wait times and saturation for one engine."""
+
+    def __init__(self, buckets=WAIT_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.pool = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.bucket_counts = [0] * (len(self.buckets) + 1)
+            self.peak_checked_out = 0
+
+    def observe(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            index = next((i for i, bound in enumerate(self.buckets) if wait <= bound), len(self.buckets))
+            self.bucket_counts[index] += 1
+            if self.pool is not None:
+                self.peak_checked_out = max(self.peak_checked_out, self.pool.checkedout())
+
+    def snapshot(self) -> Dict:
+        pool = self.pool
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            buckets: List[Dict] = []
+            running = 0
+            for bound, count in zip([*self.buckets, None], self.bucket_counts):
+                running += count
+                buckets.append({"le": bound if bound is not None else "+Inf", "count": running})
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_total,
+                "wait_seconds_avg": self.wait_total / observed if observed else 0.0,
+                "wait_seconds_max": self.wait_max,
+                "wait_seconds_buckets": buckets,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            data.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                # Share of the connections this worker may open that are in use.
+                "saturation": pool.checkedout() / capacity if capacity > 0 else 0.0,
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+read_pool_metrics = PoolMetrics()
+async_read_pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` that reports how long each checkout waited to ``metrics``."""
+
+    metrics = pool_metrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() builds a new instance, which takes over the reporting.
+        self.metrics.pool = self
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool(metrics: PoolMetrics, base=QueuePool):
+    """A ``TimedQueuePool`` reporting to ``metrics``, on top of ``base``.
+
+    ``base`` is ``AsyncAdaptedQueuePool`` for async engines.
+    """
+    if base is QueuePool:
+        return type("TimedQueuePool", (TimedQueuePool,), {"metrics": metrics})
+    return type(f"Timed{base.__name__}", (TimedQueuePool, base), {"metrics": metrics})
+
+
+class CacheMetrics:
+    """Hit and miss counts of a cache, per table."""
+
+    OUTCOMES = ("local_hits", "hits", "negative_hits", "misses", "early_refreshes", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, table: str, outcome: str):
+        with self._lock:
+            counts = self.counts.setdefault(table, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            tables = {table: dict(counts) for table, counts in self.counts.items()}
+        for counts in tables.values():
+            served = counts["local_hits"] + counts["hits"] + counts["negative_hits"]
+            lookups = served + counts["misses"] + counts["early_refreshes"]
+            counts["hit_ratio"] = served / lookups if lookups else 0.0
+        return tables
+
+
+entity_cache_metrics = CacheMetrics()
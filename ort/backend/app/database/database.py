@@ -1,19 +1,328 @@
-from sqlalchemy import create_engine
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import ForeignKeyConstraint, MetaData, create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.schema import AddConstraint, CreateColumn, CreateIndex, CreateTable
+
+from app.core.config import Settings, async_url, settings, sync_url
+from app.core.metrics import PoolMetrics, async_read_pool_metrics, pool_metrics, read_pool_metrics, timed_pool
+from app.database.routing import pinned
+
+SQLALCHEMY_DATABASE_URL = settings.sync_database_url
+
+
+def sqlite_pragmas(config: Settings, read_only: bool = False) -> List[str]:
+    """PRAGMAs run on every new SQLite connection."""
+    pragmas = [
+        # SQLite ignores REFERENCES and ON DELETE unless enforcement is
+        # switched on, per connection.
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous={config.sqlite_synchronous}",
+        f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(config.sqlite_cache_size)}",
+        f"PRAGMA temp_store={config.sqlite_temp_store}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # The journal mode is stored in the database file; the writer sets it.
+        pragmas.insert(0, f"PRAGMA journal_mode={config.sqlite_journal_mode}")
+    return pragmas
+
+
+def create_db_engine(
+    config: Settings = settings,
+    url: Optional[str] = None,
+    read_only: bool = False,
+    asynchronous: bool = False,
+    metrics: Optional[PoolMetrics] = None,
+):
+    """Build an engine for ``url`` (default: the configured database) from ``config``.
+
+    A ``read_only`` engine refuses writes at the connection level and gets
+    its own pool (``db_read_pool_size``) and pool metrics. ``asynchronous``
+    builds an ``AsyncEngine`` on the async driver for the same database.
+    ``metrics`` overrides where the pool reports, e.g. for a replica.
+    """
+    if url is None:
+        url = config.async_database_url if asynchronous else config.sync_database_url
+    url = make_url(url)
+    backend = url.get_backend_name()
+    options = {
+        "echo": config.db_echo,
+        "pool_pre_ping": config.db_pool_pre_ping,
+        "pool_recycle": config.db_pool_recycle,
+    }
+    connect_args = {}
+    if backend == "sqlite":
+        connect_args["check_same_thread"] = False
+    elif backend == "postgresql":
+        server_settings = {}
+        if config.db_statement_timeout_ms:
+            server_settings["statement_timeout"] = str(config.db_statement_timeout_ms)
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        if server_settings and url.get_driver_name() == "asyncpg":
+            connect_args["server_settings"] = server_settings
+        elif server_settings:
+            connect_args["options"] = " ".join(f"-c {name}={value}" for name, value in server_settings.items())
+    # An in-memory SQLite database lives in a single connection, so it keeps
+    # SQLAlchemy's default pool; everything else gets the sized, timed pool.
+    if url.database not in (None, "", ":memory:"):
+        if asynchronous:
+            poolclass = timed_pool(metrics or (async_read_pool_metrics if read_only else pool_metrics), AsyncAdaptedQueuePool)
+        else:
+            poolclass = timed_pool(metrics or (read_pool_metrics if read_only else pool_metrics), QueuePool)
+        options.update(
+            poolclass=poolclass,
+            pool_size=config.db_read_pool_size if read_only else config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+        )
+    if asynchronous:
+        engine = create_async_engine(url, connect_args=connect_args, **options)
+        events = engine.sync_engine
+    else:
+        engine = events = create_engine(url, connect_args=connect_args, **options)
+
+    if backend == "sqlite":
+        pragmas = sqlite_pragmas(config, read_only)
+        # Writers take the write lock up front, so busy_timeout applies to it
+        # instead of failing when a read transaction later tries to write.
+        begin = "BEGIN" if read_only else "BEGIN IMMEDIATE"
+
+        @event.listens_for(events, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+            # Let SQLAlchemy, not the sqlite3 module, decide where transactions
+            # start; the module's implicit BEGIN breaks SAVEPOINT nesting.
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(events, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql(begin)
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./real_estate.db"
+    return engine
+
+
+engine = create_db_engine()
+# GET routes read through their own pool. An in-memory database cannot be
+# shared between engines, so there reads use the main engine.
+if make_url(SQLALCHEMY_DATABASE_URL).database in (None, "", ":memory:"):
+    read_engine = engine
+else:
+    read_engine = create_db_engine(read_only=True)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 local_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+read_session = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async routes read through an AsyncSession in "native" mode; in
+# "threadpool" mode (the default for a plain sqlite:// URL) they use
+# read_session in worker threads and no async driver is needed.
+if settings.async_mode == "native":
+    async_read_engine = create_db_engine(read_only=True, asynchronous=True)
+    async_read_session = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_read_engine = async_read_session = None
+
+# Read replicas (db_replica_urls), each with its own read-only engine and
+# pool metrics. Their sessions are tagged so callers can tell a possibly
+# lagging read from a primary one.
+replica_pool_metrics = [PoolMetrics() for _ in settings.db_replica_urls]
+replica_engines = [
+    create_db_engine(url=sync_url(url), read_only=True, metrics=metrics)
+    for url, metrics in zip(settings.db_replica_urls, replica_pool_metrics)
+]
+replica_sessions = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica, info={"replica": True})
+    for replica in replica_engines
+]
+if settings.async_mode == "native":
+    async_replica_pool_metrics = [PoolMetrics() for _ in settings.db_replica_urls]
+    async_replica_engines = [
+        create_db_engine(url=async_url(url), read_only=True, asynchronous=True, metrics=metrics)
+        for url, metrics in zip(settings.db_replica_urls, async_replica_pool_metrics)
+    ]
+    async_replica_sessions = [
+        async_sessionmaker(replica, autoflush=False, expire_on_commit=False, info={"replica": True})
+        for replica in async_replica_engines
+    ]
+else:
+    async_replica_pool_metrics, async_replica_engines, async_replica_sessions = [], [], []
+
+_next_replica = itertools.count()
+
+
+def _route(primary_factory, replica_factories, primary: bool):
+    if primary or not replica_factories:
+        return primary_factory
+    return replica_factories[next(_next_replica) % len(replica_factories)]
+
+
+def read_sessionmaker(primary: bool = False):
+    """The session factory for a read: the primary's when ``primary`` is set
+    or no replica is configured, otherwise the next replica's in turn."""
+    return _route(read_session, replica_sessions, primary)
+
 
 Base = declarative_base()
 
-def get_db():
-    db = local_session()
+
+def _on_delete(action: Optional[str]) -> Optional[str]:
+    action = (action or "").upper()
+    return None if action in ("", "NO ACTION") else action
+
+
+def _stale_foreign_keys(inspector, table) -> List[Tuple[Dict[str, Any], ForeignKeyConstraint]]:
+    """(reflected, declared) foreign keys of ``table`` whose ON DELETE differs."""
+    declared = {
+        (tuple(fk.column_keys), fk.referred_table.name): fk
+        for fk in table.foreign_key_constraints
+    }
+    stale = []
+    for reflected in inspector.get_foreign_keys(table.name):
+        fk = declared.get((tuple(reflected["constrained_columns"]), reflected["referred_table"]))
+        if fk is not None and _on_delete(fk.ondelete) != _on_delete(reflected.get("options", {}).get("ondelete")):
+            stale.append((reflected, fk))
+    return stale
+
+
+def _rebuild_sqlite_table(connection, table):
+    # SQLite cannot alter a constraint, so the table is recreated from the
+    # model and the rows copied over; indexes come back in
+    # create_missing_indexes.
+    preparer = connection.dialect.identifier_preparer
+    present = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    columns = ", ".join(preparer.quote(column.name) for column in table.columns if column.name in present)
+    metadata = MetaData()
+    for referred in {fk.referred_table for fk in table.foreign_key_constraints}:
+        referred.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name=f"_rebuild_{table.name}")
+    connection.execute(CreateTable(rebuilt))
+    connection.exec_driver_sql(
+        f"INSERT INTO {preparer.format_table(rebuilt)} ({columns}) SELECT {columns} FROM {preparer.format_table(table)}"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {preparer.format_table(table)}")
+    connection.exec_driver_sql(f"ALTER TABLE {preparer.format_table(rebuilt)} RENAME TO {preparer.format_table(table)}")
+
+
+def update_foreign_keys(bind):
+    """Give existing tables the ON DELETE actions their models declare.
+
+    ``create_all`` leaves existing tables alone, so a changed ``ondelete``
+    would otherwise only reach new databases. Other databases drop and
+    re-add the constraint; SQLite rebuilds the table, with foreign key
+    enforcement off so dropping the old table does not fire the actions.
+    """
+    preparer = bind.dialect.identifier_preparer
+    with bind.connect() as connection:
+        inspector = inspect(connection)
+        stale = {
+            table: _stale_foreign_keys(inspector, table)
+            for table in Base.metadata.sorted_tables
+            if inspector.has_table(table.name)
+        }
+        stale = {table: fks for table, fks in stale.items() if fks}
+        if not stale:
+            return
+        if bind.dialect.name != "sqlite":
+            with connection.begin():
+                for table, fks in stale.items():
+                    for reflected, fk in fks:
+                        connection.exec_driver_sql(
+                            f"ALTER TABLE {preparer.format_table(table)} DROP CONSTRAINT {preparer.quote(reflected['name'])}"
+                        )
+                        connection.execute(AddConstraint(fk))
+            return
+        # PRAGMA foreign_keys is ignored inside a transaction.
+        connection.commit()
+        raw = connection.connection.dbapi_connection
+        raw.execute("PRAGMA foreign_keys=OFF")
+        try:
+            with connection.begin():
+                for table in stale:
+                    _rebuild_sqlite_table(connection, table)
+                if connection.exec_driver_sql("PRAGMA foreign_key_check").first() is not None:
+                    raise RuntimeError("Rebuilt tables violate their foreign keys")
+        finally:
+            raw.execute("PRAGMA foreign_keys=ON")
+
+
+def add_missing_columns(bind):
+    """Add model columns that existing tables lack.
+
+    ``create_all`` only creates missing tables, so columns added to a model
+    later are added here with ``ALTER TABLE ... ADD COLUMN``. That only
+    works for columns that are nullable or have a constant server default.
+    """
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    spec = CreateColumn(column).compile(dialect=bind.dialect)
+                    connection.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}")
+
+
+def create_missing_indexes(bind):
+    """Create model indexes that existing tables lack.
+
+    ``create_all`` only indexes the tables it creates. ``IF NOT EXISTS``
+    makes this a no-op for indexes that are there, also when several
+    workers start at once.
+    """
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+class AsyncDB:
+    """A read session for ``async def`` routes.
+
+    ``await db.run(fn, *args)`` calls ``fn(session, *args)`` with a regular
+    ``Session``, so the query helpers are shared with sync code. On an
+    ``AsyncSession`` this goes through ``run_sync`` and never leaves the
+    event loop; on a sync session it runs in the threadpool.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def replica(self) -> bool:
+        """Whether reads may lag the primary (see ``replica_sessions``)."""
+        return bool(self.session.info.get("replica"))
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_async_read_db(request: Request):
+    primary = pinned(request)
+    if async_read_session is not None:
+        async with _route(async_read_session, async_replica_sessions, primary)() as session:
+            yield AsyncDB(session)
+        return
+    session = read_sessionmaker(primary)()
     try:
-        yield db
+        yield AsyncDB(session)
     finally:
-        db.close()
\ No newline at end of file
+        await run_in_threadpool(session.close)
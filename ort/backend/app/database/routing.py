@@ -0,0 +1,56 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+from app.core.config import settings
+
+# Set on responses to successful writes: the time (Unix seconds) until which
+# the client reads from the primary. Browsers send the cookie back; other
+# clients can echo the header.
+PRIMARY_COOKIE = "read_primary_until"
+PRIMARY_HEADER = "X-Read-Primary-Until"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def pinned(request: Request) -> bool:
+    """Whether ``request`` comes from a client that wrote recently."""
+    value = request.headers.get(PRIMARY_HEADER) or request.cookies.get(PRIMARY_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients whose write succeeded so their reads skip the replicas.
+
+    Only needed with ``db_replica_urls``; without replicas every read
+    already sees the primary and no marker is set.
+    """
+
+    def __init__(self, app, window: float = settings.read_your_writes_seconds):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or self.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marked(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = f"{time.time() + self.window:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{PRIMARY_COOKIE}={until}; Max-Age={math.ceil(self.window)}; Path=/; SameSite=Lax; HttpOnly",
+                )
+                headers.append(PRIMARY_HEADER, until)
+            await send(message)
+
+        await self.app(scope, receive, send_marked)
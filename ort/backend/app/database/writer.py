@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+from app.core.config import settings
+from app.database.database import local_session
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Runs write work on one dedicated session, committing in groups.
+
+    ``submit(fn, *args)`` queues ``fn(session, *args)``. A single writer
+    thread takes whatever work arrived within ``window`` seconds of the
+    first item (up to ``max_batch`` items), runs each item inside its own
+    SAVEPOINT and then commits the whole group once. A failing item only
+    rolls back its savepoint and gets its exception; the others commit.
+    Results are handed back through futures after the commit, so a caller
+    never sees a write that is not durable yet.
+
+    ``timeout`` only bounds the wait in the queue: once the writer thread
+    has started an item it will commit it, so callers wait for the outcome
+    and never miss invalidating what it wrote.
+
+    Work functions must not commit or roll back themselves.
+    """
+
+    def __init__(
+        self,
+        session_factory=local_session,
+        window: float = settings.write_batch_window_ms / 1000,
+        max_batch: int = settings.write_batch_max_size,
+        timeout: float = settings.write_timeout,
+    ):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Submit ``fn`` and wait for its committed result (or exception)."""
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise
+        return future.result()
+
+    async def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """``run`` for ``async def`` routes: awaits the result without holding a thread."""
+        future = self.submit(fn, *args, **kwargs)
+        result = asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(result), self.timeout)
+        except asyncio.TimeoutError:
+            # Still queued: it will never run. Otherwise it is being written.
+            if future.cancel():
+                raise
+        return await result
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> Tuple[List, bool]:
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._commit_group(batch)
+            except Exception as exc:
+                # e.g. no connection could be opened: fail this group, keep serving.
+                logger.exception("Write group failed")
+                for future, *_ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _commit_group(self, batch: List):
+        session = self.session_factory()
+        try:
+            results = []
+            for future, fn, args, kwargs in batch:
+                try:
+                    with session.begin_nested():
+                        results.append((future, fn(session, *args, **kwargs), None))
+                except Exception as exc:
+                    results.append((future, None, exc))
+            try:
+                session.commit()
+            except Exception:
+                logger.exception("Group commit of %d writes failed; retrying one by one", len(batch))
+                session.rollback()
+                self._commit_each(session, batch)
+                return
+            for future, result, exc in results:
+                if exc is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(exc)
+        finally:
+            session.close()
+
+    @staticmethod
+    def _commit_each(session, batch: List):
+        for future, fn, args, kwargs in batch:
+            try:
+                result = fn(session, *args, **kwargs)
+                session.commit()
+            except Exception as exc:
+                session.rollback()
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+writer = WriteQueue()
+
+
+def get_writer() -> WriteQueue:
+    return writer
@@ -0,0 +1,31 @@
+"""Export a resource as NDJSON or CSV.
+
+    python -m app.export properties --format csv --output properties.csv
+"""
+import argparse
+import sys
+
+from app.export.export import EXPORTS, WRITERS, stream_export
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.export", description="Stream a table to NDJSON or CSV.")
+    parser.add_argument("resource", choices=sorted(EXPORTS))
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson")
+    parser.add_argument("--output", "-o", help="File to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        out = open(args.output, "w", newline="", encoding="utf-8")
+    else:
+        out = sys.stdout
+    try:
+        for chunk in stream_export(args.resource, args.format):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import select
+
+from app.database.database import read_session
+from app.models.models import User, Client, Property, PropertyImage, Listing, Inquiry, Appointment, Transaction, Payment
+from app.schemas.schemas import (
+    UserResponse, ClientResponse, PropertyResponse, PropertyImageResponse, ListingResponse,
+    InquiryResponse, AppointmentResponse, TransactionResponse, PaymentResponse
+)
+
+# Exported columns are the fields of each resource's response schema, so an
+# export never contains more than the API itself exposes (no password hashes).
+EXPORTS = {
+    "users": (User, UserResponse),
+    "clients": (Client, ClientResponse),
+    "properties": (Property, PropertyResponse),
+    "property-images": (PropertyImage, PropertyImageResponse),
+    "listings": (Listing, ListingResponse),
+    "inquiries": (Inquiry, InquiryResponse),
+    "appointments": (Appointment, AppointmentResponse),
+    "transactions": (Transaction, TransactionResponse),
+    "payments": (Payment, PaymentResponse),
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows fetched from the database cursor at a time.
+BATCH_SIZE = 1000
+# Rows buffered into one chunk of the HTTP response / one file write.
+CHUNK_ROWS = 500
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson(fields: List[str], rows: Iterable) -> Iterator[str]:
+    dumps = json.JSONEncoder(separators=(",", ":"), default=_json_default).encode
+    chunk = []
+    for row in rows:
+        chunk.append(dumps(dict(zip(fields, row))))
+        if len(chunk) >= CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def _csv(fields: List[str], rows: Iterable) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+WRITERS = {
+    "ndjson": _ndjson,
+    "csv": _csv,
+}
+
+
+def stream_export(resource: str, fmt: str, session_factory=read_session, batch_size: int = BATCH_SIZE) -> Iterator[str]:
+    """Yield ``resource`` serialized as ``fmt`` in chunks, with flat memory use.
+
+    The generator opens and closes its own session so it can outlive the
+    request that started it (StreamingResponse iterates after the handler
+    has returned). Rows are plain column tuples pulled ``batch_size`` at a
+    time through a server-side cursor; no ORM objects are built.
+    """
+    model, schema = EXPORTS[resource]
+    fields = list(schema.model_fields)
+    columns = [getattr(model, name) for name in fields]
+    write = WRITERS[fmt]
+
+    session = session_factory()
+    try:
+        result = session.execute(
+            select(*columns).order_by(model.id).execution_options(yield_per=batch_size)
+        )
+        yield from write(fields, result)
+    finally:
+        session.close()
@@ -0,0 +1,39 @@
+"""Import a partner property feed (CSV) into the database.
+
+    python -m app.importer feed.csv --batch-size 500
+"""
+import argparse
+import os
+
+from app.api.v1.writes import insert_row
+from app.database.writer import writer
+from app.importer.importer import BATCH_SIZE, run_import
+from app.models.models import ImportJob
+from app.schemas.schemas import ImportJobResponse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.importer", description="Upsert properties and listings from a CSV feed.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    job_id = writer.run(insert_row, ImportJob, {"filename": os.path.basename(args.path)}, ImportJobResponse)["id"]
+
+    def report(job):
+        print(
+            f"batch {job.batches_committed}: {job.rows_processed} rows "
+            f"({job.rows_created} created, {job.rows_updated} updated, {job.rows_failed} failed)",
+            flush=True,
+        )
+
+    job = run_import(job_id, args.path, batch_size=args.batch_size, on_batch=report)
+    writer.close()
+    print(f"import job {job.id} {job.status}" + (f": {job.error}" if job.error else ""))
+    if job.rows_failed:
+        print(f"row errors: GET /api/v1/imports/{job.id}/errors")
+    raise SystemExit(0 if job.status == "completed" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.v1.bulk import field_errors, integrity_errors
+from app.cache.entities import entities
+from app.cache.responses import responses
+from app.database.writer import WriteQueue, writer as default_writer
+from app.models.models import ImportJob, ImportRowError, Listing, Property
+from app.schemas.schemas import ImportJobResponse, ListingCreate, PropertyCreate
+
+BATCH_SIZE = 500
+
+REQUIRED_COLUMNS = {"title", "property_type", "address", "price"}
+PROPERTY_COLUMNS = [name for name in PropertyCreate.model_fields]
+LISTING_COLUMNS = ["listing_type", "listed_price", "listing_date", "expiry_date"]
+
+
+class ImportFailed(Exception):
+    """The feed cannot be imported at all (as opposed to individual bad rows)."""
+
+
+def read_batches(stream: TextIO, batch_size: int = BATCH_SIZE) -> Iterator[List[Tuple[int, Dict]]]:
+    """Yield ``(row_number, row)`` lists of at most ``batch_size`` CSV rows.
+
+    Only one batch is held in memory at a time. Row numbers are the line
+    numbers a spreadsheet would show, counting the header as line 1.
+    """
+    reader = csv.DictReader(stream)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
+    if missing:
+        raise ImportFailed(f"Missing required columns: {', '.join(sorted(missing))}")
+
+    batch = []
+    for row_number, row in enumerate(reader, start=2):
+        batch.append((row_number, _clean(row)))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _clean(row: Dict) -> Dict:
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        cleaned[key.strip()] = value if value != "" else None
+    return cleaned
+
+
+def _validated(schema, row: Dict, columns: List[str], **extra) -> Dict:
+    # Only the feed's own columns: the rest are left as they are on update.
+    values = {k: row[k] for k in columns if k in row}
+    return schema.model_validate({**values, **extra}).model_dump(exclude_unset=True)
+
+
+def validate_batch(batch: List[Tuple[int, Dict]]):
+    """Split a batch into valid ``(row_number, property, listing)`` records and row errors.
+
+    Records hold only the columns present in the feed, so an update never
+    clears a column the feed does not carry.
+    """
+    records, errors = [], []
+    for row_number, row in batch:
+        try:
+            prop = _validated(PropertyCreate, row, PROPERTY_COLUMNS)
+            listing = None
+            if any(row.get(k) is not None for k in LISTING_COLUMNS):
+                # The property id is only known after the upsert.
+                listing = _validated(ListingCreate, row, LISTING_COLUMNS, property_id=0)
+            records.append((row_number, prop, listing))
+        except ValidationError as exc:
+            errors.append((row_number, field_errors(exc)))
+    return records, errors
+
+
+def _natural_key(values: Dict):
+    return values["address"], values.get("city")
+
+
+def upsert_properties(db: Session, properties: List[Dict]):
+    """Insert or update ``properties`` keyed on (address, city).
+
+    Returns ``(ids, created, updated)`` with ``ids`` mapping each natural key
+    to its property id. ``created`` and ``updated`` count input rows: the
+    first row of a new key creates it and every other row updates, so a key
+    repeated within the batch counts once per row although only its merged
+    values, later rows winning, are written.
+    """
+    by_key = {}
+    for values in properties:
+        key = _natural_key(values)
+        by_key[key] = {**by_key.get(key, {}), **values}
+
+    keyed = [key for key in by_key if key[1] is not None]
+    no_city = [address for address, city in by_key if city is None]
+    clauses = []
+    if keyed:
+        clauses.append(tuple_(Property.address, Property.city).in_(keyed))
+    if no_city:
+        clauses.append(and_(Property.city.is_(None), Property.address.in_(no_city)))
+    ids = {
+        (address, city): property_id
+        for address, city, property_id in db.execute(
+            select(Property.address, Property.city, Property.id).where(or_(*clauses))
+        )
+    }
+
+    updates = [{"id": ids[key], **values} for key, values in by_key.items() if key in ids]
+    inserts = [values for key, values in by_key.items() if key not in ids]
+    if updates:
+        db.execute(update(Property), updates)
+    if inserts:
+        rows = db.execute(
+            insert(Property).returning(Property.address, Property.city, Property.id, sort_by_parameter_order=True),
+            inserts,
+        )
+        ids.update({(address, city): property_id for address, city, property_id in rows})
+    return ids, len(inserts), len(properties) - len(inserts)
+
+
+def upsert_listings(db: Session, listings: List[Dict]):
+    """Insert or update ``listings`` keyed on (property_id, listing_type)."""
+    by_key = {}
+    for values in listings:
+        key = values["property_id"], values["listing_type"]
+        by_key[key] = {**by_key.get(key, {}), **values}
+    if not by_key:
+        return
+    existing = {
+        (property_id, listing_type): listing_id
+        for property_id, listing_type, listing_id in db.execute(
+            select(Listing.property_id, Listing.listing_type, Listing.id)
+            .where(Listing.property_id.in_({property_id for property_id, _ in by_key}))
+        )
+    }
+    updates = [{"id": existing[key], **values} for key, values in by_key.items() if key in existing]
+    inserts = [values for key, values in by_key.items() if key not in existing]
+    if updates:
+        db.execute(update(Listing), updates)
+    if inserts:
+        db.execute(insert(Listing), inserts)
+
+
+def _upsert(db: Session, records: List[Tuple[int, Dict, Optional[Dict]]]):
+    ids, created, updated = upsert_properties(db, [prop for _, prop, _ in records])
+    upsert_listings(db, [
+        {**listing, "property_id": ids[_natural_key(prop)]}
+        for _, prop, listing in records
+        if listing is not None
+    ])
+    return ids, created, updated
+
+
+def write_records(db: Session, records: List[Tuple[int, Dict, Optional[Dict]]], errors: List):
+    """Upsert ``records``, adding the rows the database refuses to ``errors``.
+
+    The batch is written in one go inside a savepoint. If the database
+    rejects it (e.g. an unknown ``agent_id``), the savepoint is rolled back
+    and the rows are retried one by one, each in its own savepoint, so only
+    the offending rows are left out. Returns ``(ids, created, updated)``.
+    """
+    try:
+        with db.begin_nested():
+            return _upsert(db, records)
+    except IntegrityError:
+        pass
+
+    ids, created, updated = {}, 0, 0
+    for record in records:
+        try:
+            with db.begin_nested():
+                row_ids, row_created, row_updated = _upsert(db, [record])
+        except IntegrityError as exc:
+            errors.append((record[0], integrity_errors(exc)))
+            continue
+        ids.update(row_ids)
+        created += row_created
+        updated += row_updated
+    return ids, created, updated
+
+
+def write_batch(
+    db: Session,
+    job_id: int,
+    batch_number: int,
+    rows: int,
+    records: List[Tuple[int, Dict, Optional[Dict]]],
+    errors: List,
+) -> Tuple[ImportJobResponse, List[int]]:
+    """Write one validated batch and the job's progress.
+
+    Run through the write queue, which commits it: a crash loses at most
+    the batch in flight, and progress is visible to GET /imports/{id} as
+    soon as each batch lands. Returns the job's progress and the ids of
+    the properties written.
+    """
+    # The queue may run this again after a failed group commit.
+    errors = list(errors)
+    ids, created, updated = write_records(db, records, errors) if records else ({}, 0, 0)
+
+    db.add_all(
+        ImportRowError(job_id=job_id, batch=batch_number, row_number=row_number, errors=json.dumps(row_errors))
+        for row_number, row_errors in sorted(errors, key=lambda error: error[0])
+    )
+    job = db.get(ImportJob, job_id)
+    job.rows_processed += rows
+    job.rows_created += created
+    job.rows_updated += updated
+    job.rows_failed += len(errors)
+    job.batches_committed += 1
+    db.flush()
+    return ImportJobResponse.model_validate(job), list(ids.values())
+
+
+def _invalidate(ids: List[int], records: List[Tuple[int, Dict, Optional[Dict]]]):
+    # Created ids as well, in case a 404 for one of them is cached.
+    entities.invalidate_sync(Property.__tablename__, *ids)
+    tags = [Property.__tablename__, *(f"{Property.__tablename__}:{i}" for i in ids)]
+    if any(listing is not None for _, _, listing in records):
+        # Listing ids are not collected; retire every cached listing.
+        entities.invalidate_tables_sync(Listing.__tablename__)
+        tags.append(Listing.__tablename__)
+    responses.purge_sync(*tags)
+
+
+def set_status(db: Session, job_id: int, status: str, error: Optional[str] = None) -> ImportJobResponse:
+    job = db.get(ImportJob, job_id)
+    job.status = status
+    job.error = error
+    if status in ("completed", "failed"):
+        job.finished_at = datetime.utcnow()
+    db.flush()
+    return ImportJobResponse.model_validate(job)
+
+
+def run_import(
+    job_id: int,
+    path: str,
+    batch_size: int = BATCH_SIZE,
+    delete_file: bool = False,
+    writer: WriteQueue = default_writer,
+    on_batch: Optional[Callable[[ImportJobResponse], None]] = None,
+) -> ImportJobResponse:
+    """Stream the CSV at ``path`` into the database, recording progress on the job.
+
+    Rows are read and validated here; every batch is then written through
+    ``writer``, so the import shares the process's single writer with the
+    API instead of competing with it for the database lock.
+    """
+    try:
+        writer.run(set_status, job_id, "running")
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as stream:
+                for batch_number, batch in enumerate(read_batches(stream, batch_size), start=1):
+                    records, errors = validate_batch(batch)
+                    job, ids = writer.run(write_batch, job_id, batch_number, len(batch), records, errors)
+                    if ids:
+                        _invalidate(ids, records)
+                    if on_batch is not None:
+                        on_batch(job)
+        except Exception as exc:
+            return writer.run(set_status, job_id, "failed", str(exc))
+        return writer.run(set_status, job_id, "completed")
+    finally:
+        if delete_file:
+            os.remove(path)
@@ -1,21 +1,60 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database.database import engine, Base
+from .core.config import settings
+from fastapi.concurrency import run_in_threadpool
+from .cache.broker import broker
+from .cache.entities import entities
+from .cache.responses import ResponseCacheMiddleware
+from .database.database import (
+    add_missing_columns, async_read_engine, async_replica_engines, create_missing_indexes, engine, Base,
+    update_foreign_keys,
+)
+from .database.routing import PRIMARY_HEADER, ReadYourWritesMiddleware
+from .database.writer import writer
 from .api.v1.api import router
 
 app = FastAPI(title="Real Estate Management API", version="1.0.0")
 
+# Added first so it sits inside CORS, which then also handles cached and
+# coalesced responses.
+if settings.response_cache_bytes > 0 or settings.coalesce_reads:
+    # Exports stream whole tables; buffering them would defeat the point.
+    app.add_middleware(ResponseCacheMiddleware, bypass=("/api/v1/export/",))
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React dev server
+    allow_origins=settings.backend_cors_origins,  # React dev server by default
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_HEADER, "ETag"],
 )
 
+# Clients that just wrote read from the primary for a short while.
+if settings.db_replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Create tables
 Base.metadata.create_all(bind=engine)
+update_foreign_keys(engine)
+add_missing_columns(engine)
+create_missing_indexes(engine)
+
+@app.on_event("startup")
+async def start_cache():
+    # Hear about writes made by the other workers.
+    await broker.start()
+
+@app.on_event("shutdown")
+async def close_connections():
+    # Let queued writes commit before the process exits.
+    await run_in_threadpool(writer.close)
+    for async_engine in [async_read_engine, *async_replica_engines]:
+        if async_engine is not None:
+            await async_engine.dispose()
+    await broker.close()
+    await entities.close()
 
 # Include all routes
 app.include_router(router, prefix="/api/v1")
@@ -1,13 +1,38 @@
 from sqlalchemy import (
     Column, Integer, String, Text, Date, DateTime, 
-    Enum, ForeignKey, Boolean, DECIMAL
+    Enum, ForeignKey, Boolean, DECIMAL, Index
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from ..database.database import Base
 
+# SQLite's CURRENT_TIMESTAMP has no fractional seconds. Bind Python datetimes in
+# the same text format so keyset comparisons against server-generated
+# timestamps behave (the default format appends ".000000").
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
+class Versioned:
+    """Columns that change on every write to a row.
+
+    ``version`` starts at 1 and every UPDATE, Core or ORM, increments it;
+    ETags are derived from it. Deletes that make the database null a
+    referencing column bump the referencing rows explicitly (see
+    ``app.api.v1.writes``). ``updated_at`` is set by the same statements
+    but only has whole seconds, so it is informational.
+    """
+
+    version = Column(Integer, nullable=False, server_default="1", onupdate=literal_column("version") + 1)
+    # A SQL default rather than a server default, so it can be added to an
+    # existing SQLite table (see add_missing_columns).
+    updated_at = Column(Timestamp, default=func.now(), onupdate=func.now())
 
-class User(Base):
+
+class User(Versioned, Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True)
@@ -17,13 +42,15 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False)
     phone = Column(String(20))
     password_hash = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
-    properties = relationship("Property", back_populates="agent")
-    clients = relationship("Client", back_populates="agent")
+    # ON DELETE in the schema does the work: passive_deletes stops the ORM
+    # from loading related rows just to null or delete them itself.
+    properties = relationship("Property", back_populates="agent", passive_deletes=True)
+    clients = relationship("Client", back_populates="agent", passive_deletes=True)
 
 
-class Client(Base):
+class Client(Versioned, Base):
     __tablename__ = "clients"
 
     id = Column(Integer, primary_key=True)
@@ -33,13 +60,13 @@ class Client(Base):
     email = Column(String(255))
     phone = Column(String(20))
     client_type = Column(Enum("buyer", "seller", "renter", name="client_types"))
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     agent = relationship("User", back_populates="clients")
-    properties = relationship("Property", back_populates="owner")
+    properties = relationship("Property", back_populates="owner", passive_deletes=True)
 
 
-class Property(Base):
+class Property(Versioned, Base):
     __tablename__ = "properties"
 
     id = Column(Integer, primary_key=True)
@@ -55,17 +82,34 @@ class Property(Base):
     bathrooms = Column(Integer)
     area_sqft = Column(Integer)
     status = Column(Enum("available", "sold", "rented", "pending", name="property_status"), default="available")
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     agent = relationship("User", back_populates="properties")
     owner = relationship("Client", back_populates="properties")
-    images = relationship("PropertyImage", back_populates="property", cascade="all, delete")
-    listings = relationship("Listing", back_populates="property")
-    inquiries = relationship("Inquiry", back_populates="property")
-    appointments = relationship("Appointment", back_populates="property")
-
-
-class PropertyImage(Base):
+    images = relationship("PropertyImage", back_populates="property", cascade="all, delete", passive_deletes=True)
+    listings = relationship("Listing", back_populates="property", passive_deletes=True)
+    inquiries = relationship("Inquiry", back_populates="property", passive_deletes=True)
+    appointments = relationship("Appointment", back_populates="property", passive_deletes=True)
+
+    # Back the GET /properties/ filters: equality columns first, then the
+    # range/sort column, so each filter combination is a single index range scan.
+    __table_args__ = (
+        Index("ix_properties_city_status_price", "city", "status", "price"),
+        Index("ix_properties_type_status_price", "property_type", "status", "price"),
+        Index("ix_properties_status_price", "status", "price"),
+        Index("ix_properties_price", "price"),
+        Index("ix_properties_created_at", "created_at"),
+        # Lone range filters and sort keys; the id tiebreaker rides along.
+        Index("ix_properties_bedrooms", "bedrooms"),
+        Index("ix_properties_bathrooms", "bathrooms"),
+        Index("ix_properties_area_sqft", "area_sqft"),
+        Index("ix_properties_title", "title"),
+        # Natural key used to upsert rows from partner feeds.
+        Index("ix_properties_address_city", "address", "city"),
+    )
+
+
+class PropertyImage(Versioned, Base):
     __tablename__ = "property_images"
 
     id = Column(Integer, primary_key=True)
@@ -76,7 +120,7 @@ class PropertyImage(Base):
     property = relationship("Property", back_populates="images")
 
 
-class Listing(Base):
+class Listing(Versioned, Base):
     __tablename__ = "listings"
 
     id = Column(Integer, primary_key=True)
@@ -89,7 +133,7 @@ class Listing(Base):
     property = relationship("Property", back_populates="listings")
 
 
-class Inquiry(Base):
+class Inquiry(Versioned, Base):
     __tablename__ = "inquiries"
 
     id = Column(Integer, primary_key=True)
@@ -97,19 +141,19 @@ class Inquiry(Base):
     client_id = Column(Integer, ForeignKey("clients.id", ondelete="SET NULL"))
     message = Column(Text)
     status = Column(Enum("new", "contacted", "closed", name="inquiry_status"), default="new")
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     property = relationship("Property", back_populates="inquiries")
     client = relationship("Client")
 
 
-class Appointment(Base):
+class Appointment(Versioned, Base):
     __tablename__ = "appointments"
 
     id = Column(Integer, primary_key=True)
     property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"))
-    agent_id = Column(Integer, ForeignKey("users.id"))
-    client_id = Column(Integer, ForeignKey("clients.id"))
+    agent_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="SET NULL"))
     appointment_date = Column(DateTime, nullable=False)
     status = Column(Enum("scheduled", "completed", "cancelled", name="appointment_status"), default="scheduled")
 
@@ -118,24 +162,26 @@ class Appointment(Base):
     client = relationship("Client")
 
 
-class Transaction(Base):
+class Transaction(Versioned, Base):
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True)
+    # No ON DELETE: a completed sale keeps its parties, so deleting a
+    # property, agent or client that still has transactions is refused.
     property_id = Column(Integer, ForeignKey("properties.id"))
     agent_id = Column(Integer, ForeignKey("users.id"))
     buyer_id = Column(Integer, ForeignKey("clients.id"))
     sale_price = Column(DECIMAL(12, 2), nullable=False)
     commission = Column(DECIMAL(12, 2))
-    transaction_date = Column(Date, nullable=False)
+    transaction_date = Column(Date, nullable=False, index=True)
 
     property = relationship("Property")
     agent = relationship("User")
     buyer = relationship("Client")
-    payments = relationship("Payment", back_populates="transaction", cascade="all, delete")
+    payments = relationship("Payment", back_populates="transaction", cascade="all, delete", passive_deletes=True)
 
 
-class Payment(Base):
+class Payment(Versioned, Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True)
@@ -144,4 +190,43 @@ class Payment(Base):
     payment_method = Column(String(30))
     payment_date = Column(Date, server_default=func.current_date())
 
-    transaction = relationship("Transaction", back_populates="payments")
\ No newline at end of file
+    transaction = relationship("Transaction", back_populates="payments")
+
+    # Covers the per-transaction SUM(amount) used for payment balances.
+    __table_args__ = (
+        Index("ix_payments_transaction_id_amount", "transaction_id", "amount"),
+    )
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True)
+    filename = Column(String(255))
+    status = Column(
+        Enum("pending", "running", "completed", "failed", name="import_status"),
+        default="pending",
+        nullable=False,
+    )
+    rows_processed = Column(Integer, default=0, nullable=False)
+    rows_created = Column(Integer, default=0, nullable=False)
+    rows_updated = Column(Integer, default=0, nullable=False)
+    rows_failed = Column(Integer, default=0, nullable=False)
+    batches_committed = Column(Integer, default=0, nullable=False)
+    error = Column(Text)
+    created_at = Column(Timestamp, server_default=func.now())
+    finished_at = Column(DateTime)
+
+    row_errors = relationship("ImportRowError", back_populates="job", cascade="all, delete", passive_deletes=True)
+
+
+class ImportRowError(Base):
+    __tablename__ = "import_row_errors"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    batch = Column(Integer, nullable=False)
+    row_number = Column(Integer, nullable=False)
+    errors = Column(Text, nullable=False)
+
+    job = relationship("ImportJob", back_populates="row_errors")
@@ -1,6 +1,33 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar, Union
 from datetime import datetime, date
+import json
+
+T = TypeVar("T")
+
+# Pagination envelope
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+# Bulk create report
+class BulkFieldError(BaseModel):
+    loc: List[Union[str, int]]
+    msg: str
+    type: str
+
+class BulkRowError(BaseModel):
+    index: int
+    errors: List[BulkFieldError]
+
+class BulkCreateResult(BaseModel, Generic[T]):
+    created: List[T]
+    errors: List[BulkRowError]
+
+# Bulk delete report
+class BulkDeleteResult(BaseModel):
+    deleted: List[int]
+    missing: List[int]
 
 # User schema
 class UserBase(BaseModel):
@@ -24,9 +51,31 @@ class UserCreate(UserBase):
             raise ValueError("Field cannot be blank")
         return value.strip()
 
+class UserUpdate(BaseModel):
+    role: Optional[str] = Field(None, pattern="^(agent|admin|user)$")
+    first_name: Optional[str] = Field(None, min_length=2, max_length=100)
+    last_name: Optional[str] = Field(None, min_length=2, max_length=100)
+    email: Optional[str] = Field(None, max_length=255)
+    phone: Optional[str] = Field(None, max_length=20)
+    password: Optional[str] = Field(None, min_length=8)
+
+    @validator("first_name", "last_name", "email", pre=True)
+    def no_blank(cls, value):
+        if not value or not value.strip():
+            raise ValueError("Field cannot be blank")
+        return value.strip()
+
+    @validator("role", "password", pre=True)
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("Field cannot be null")
+        return value
+
 class UserResponse(UserBase):
     id: int
     created_at: datetime
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True  # Changed from orm_mode=True in Pydantic V2
@@ -49,9 +98,31 @@ class ClientCreate(ClientBase):
             raise ValueError("Field cannot be blank")
         return value.strip()
 
+class ClientUpdate(BaseModel):
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    client_type: Optional[str] = Field(None, pattern="^(buyer|seller|renter)$")
+    agent_id: Optional[int] = None
+
+    @validator("first_name", "last_name", pre=True)
+    def no_blank(cls, value):
+        if not value or not value.strip():
+            raise ValueError("Field cannot be blank")
+        return value.strip()
+
+    @validator("client_type", pre=True)
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("Field cannot be null")
+        return value
+
 class ClientResponse(ClientBase):
     id: int
     created_at: datetime
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -83,10 +154,38 @@ class PropertyCreate(PropertyBase):
             raise ValueError("Field cannot be blank")
         return value.strip()
 
+class PropertyUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    property_type: Optional[str] = Field(None, pattern="^(house|apartment|land|commercial)$")
+    address: Optional[str] = None
+    city: Optional[str] = None
+    price: Optional[float] = Field(None, gt=0)
+    bedrooms: Optional[int] = Field(None, ge=0)
+    bathrooms: Optional[int] = Field(None, ge=0)
+    area_sqft: Optional[int] = Field(None, gt=0)
+    status: Optional[str] = Field(None, pattern="^(available|sold|rented|pending)$")
+    agent_id: Optional[int] = None
+    owner_id: Optional[int] = None
+
+    @validator("title", "address", pre=True)
+    def no_blank(cls, value):
+        if not value or not value.strip():
+            raise ValueError("Field cannot be blank")
+        return value.strip()
+
+    @validator("property_type", "price", "status", pre=True)
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("Field cannot be null")
+        return value
+
 class PropertyResponse(PropertyBase):
     id: int
     status: str
     created_at: datetime
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -101,6 +200,8 @@ class PropertyImageCreate(PropertyImageBase):
 
 class PropertyImageResponse(PropertyImageBase):
     id: int
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -119,6 +220,8 @@ class ListingCreate(ListingBase):
 
 class ListingResponse(ListingBase):
     id: int
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -135,6 +238,8 @@ class InquiryResponse(InquiryBase):
     id: int
     status: str
     created_at: datetime
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -151,6 +256,8 @@ class AppointmentCreate(AppointmentBase):
 class AppointmentResponse(AppointmentBase):
     id: int
     status: str
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -169,6 +276,8 @@ class TransactionCreate(TransactionBase):
 
 class TransactionResponse(TransactionBase):
     id: int
+    version: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -185,6 +294,71 @@ class PaymentCreate(PaymentBase):
 class PaymentResponse(PaymentBase):
     id: int
     payment_date: date
+    version: int
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Resources with related resources (include=)
+class PropertyWithIncludes(PropertyResponse):
+    images: Optional[List[PropertyImageResponse]] = None
+    listings: Optional[List[ListingResponse]] = None
+    inquiries: Optional[List[InquiryResponse]] = None
+    appointments: Optional[List[AppointmentResponse]] = None
+    agent: Optional[UserResponse] = None
+    owner: Optional[ClientResponse] = None
+
+class TransactionWithIncludes(TransactionResponse):
+    payments: Optional[List[PaymentResponse]] = None
+    buyer: Optional[ClientResponse] = None
+    agent: Optional[UserResponse] = None
+    property: Optional[PropertyResponse] = None
+
+# Payment progress per transaction
+class TransactionBalance(BaseModel):
+    transaction_id: int
+    sale_price: float
+    total_paid: float
+    remaining_balance: float
+    percent_paid: float
+
+# Dashboard schema
+class DashboardSummary(BaseModel):
+    properties: int
+    clients: int
+    transactions: int
+    appointments: int
+    total_revenue: float
+    recent_properties: List[PropertyResponse]
+    recent_transactions: List[TransactionResponse]
+
+# Import jobs
+class ImportJobResponse(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    status: str
+    rows_processed: int
+    rows_created: int
+    rows_updated: int
+    rows_failed: int
+    batches_committed: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ImportRowErrorResponse(BaseModel):
+    id: int
+    batch: int
+    row_number: int
+    errors: List[BulkFieldError]
+
+    @validator("errors", pre=True)
+    def decode_json(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,96 @@
+"""Compare the response_model read path with the row-tuple fast path.
+
+    cd backend && python -m benchmarks.bench_serialization --rows 10000
+
+Both paths run against the same in-memory SQLite table. The "response_model"
+path is what FastAPI does for ``response_model=List[PropertyResponse]`` with
+ORM objects: hydrate entities, validate every attribute with
+``from_attributes``, dump to JSON-compatible Python, then ``json.dumps``.
+The fast path selects the schema columns as tuples and encodes them with
+``pydantic_core.to_json``.
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.fields import project
+from app.api.v1.serializers import json_response
+from app.database.database import Base
+from app.models.models import Property
+from app.schemas.schemas import PropertyResponse
+
+
+def seed(session, rows: int):
+    session.execute(insert(Property), [
+        {
+            "title": f"Property {i}",
+            "description": "A bright family home close to schools and transport. " * 4,
+            "property_type": "house" if i % 2 else "apartment",
+            "address": f"{i} Main Street",
+            "city": "Kampala",
+            "price": 100000 + i,
+            "bedrooms": i % 5,
+            "bathrooms": i % 3,
+            "area_sqft": 900 + i % 400,
+            "status": "available",
+            "created_at": datetime(2024, 1, 1),
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def response_model_path(session, rows: int) -> bytes:
+    adapter = TypeAdapter(List[PropertyResponse])
+    objects = session.query(Property).order_by(Property.id).limit(rows).all()
+    validated = adapter.validate_python(objects, from_attributes=True)
+    body = json.dumps(adapter.dump_python(validated, mode="json"), separators=(",", ":")).encode()
+    session.expunge_all()
+    return body
+
+
+def fast_path(session, rows: int) -> bytes:
+    fields = list(PropertyResponse.model_fields)
+    result = project(session.query(Property), fields).order_by(Property.id).limit(rows).all()
+    return json_response([dict(zip(fields, row)) for row in result]).body
+
+
+def measure(fn, session, rows: int, repeat: int) -> float:
+    fn(session, rows)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(session, rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    seed(session, args.rows)
+
+    assert json.loads(response_model_path(session, 50)) == json.loads(fast_path(session, 50))
+
+    slow = measure(response_model_path, session, args.rows, args.repeat)
+    fast = measure(fast_path, session, args.rows, args.repeat)
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"  response_model path: {slow * 1000:8.1f} ms")
+    print(f"  fast path:           {fast * 1000:8.1f} ms  ({slow / fast:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare single-row create throughput: add/commit/refresh vs INSERT ... RETURNING.
+
+    cd backend && python -m benchmarks.bench_writes --rows 2000
+
+Each path creates ``--rows`` inquiries and payments one request's worth at a
+time (one transaction per row, as the API does) against a file-backed
+SQLite database with the app's connection profile (WAL, synchronous=NORMAL),
+so commit costs are included. ``--memory`` uses an in-memory database
+instead, isolating the per-statement overhead.
+
+The gain is the refresh round trip that RETURNING removes; under the
+app's profile that refresh is a transaction of its own.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.writes import insert_row
+from app.core.config import settings
+from app.database.database import Base, create_db_engine
+from app.models.models import Client, Inquiry, Payment, Property, Transaction, User
+from app.schemas.schemas import InquiryCreate, InquiryResponse, PaymentCreate, PaymentResponse
+
+CASES = [
+    (Inquiry, InquiryResponse, InquiryCreate(property_id=1, client_id=1, message="Is this still available?")),
+    (Payment, PaymentResponse, PaymentCreate(transaction_id=1, amount=1500, payment_method="bank_transfer")),
+]
+
+
+def seed(session):
+    """The rows CASES refer to, since the app's profile enforces foreign keys."""
+    session.add_all([
+        User(id=1, role="agent", first_name="Bench", last_name="Agent", email="bench@example.com", password_hash="x"),
+        Client(id=1, first_name="Bench", last_name="Client", client_type="buyer"),
+        Property(id=1, title="Bench", property_type="house", address="1 Bench St", price=1),
+    ])
+    session.flush()
+    session.add(Transaction(id=1, property_id=1, agent_id=1, buyer_id=1, sale_price=1, transaction_date=date(2024, 1, 1)))
+    session.commit()
+
+
+def refresh_path(session, model, response_schema, payload):
+    obj = model(**payload.model_dump())
+    session.add(obj)
+    session.commit()
+    session.refresh(obj)
+    response_schema.model_validate(obj).model_dump(mode="json")
+    session.expunge_all()
+
+
+def returning_path(session, model, response_schema, payload):
+    insert_row(session, model, payload.model_dump(), response_schema)
+    session.commit()
+
+
+def measure(fn, session, rows: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rows):
+        for model, response_schema, payload in CASES:
+            fn(session, model, response_schema, payload)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--memory", action="store_true", help="use an in-memory database")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = "" if args.memory else os.path.join(directory, "bench.db")
+        engine = create_db_engine(settings, url=f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        seed(session)
+
+        total = args.rows * len(CASES)
+        results = []
+        for label, fn in [("add/commit/refresh", refresh_path), ("INSERT ... RETURNING", returning_path)]:
+            fn(session, *CASES[0])  # warm up
+            results.append((label, measure(fn, session, args.rows)))
+        session.close()
+        engine.dispose()
+
+    print(f"{total} single-row creates per path")
+    for label, elapsed in results:
+        print(f"  {label:<22} {total / elapsed:8.0f} rows/s  ({elapsed * 1000 / total:.3f} ms/row)")
+    print(f"  speedup: {results[0][1] / results[1][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
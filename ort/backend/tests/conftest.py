@@ -0,0 +1,82 @@
+import os
+import tempfile
+import uuid
+
+# The app binds its engines and caches at import time, so point it at a
+# scratch database before anything from app is imported. Like the tracked
+# .env, the URL names aiosqlite, so reads take the native async path;
+# TEST_DATABASE_DRIVER=sqlite runs the suite in threadpool mode instead.
+_data_dir = tempfile.mkdtemp(prefix="ort-tests-")
+os.environ["DATABASE_URL"] = f"{os.environ.get('TEST_DATABASE_DRIVER', 'sqlite+aiosqlite')}:///{_data_dir}/test.db"
+os.environ.pop("DB_ASYNC_MODE", None)
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("DB_REPLICA_URLS", None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def city():
+    """A city no other test uses, to filter a test's own properties."""
+    return f"city-{uuid.uuid4().hex[:8]}"
+
+
+def _defaults(resource: str) -> dict:
+    unique = uuid.uuid4().hex[:12]
+    return {
+        "users": {
+            "role": "agent", "first_name": "Ada", "last_name": "Agent",
+            "email": f"{unique}@example.com", "password": "password1",
+        },
+        "clients": {"first_name": "Cy", "last_name": "Client", "client_type": "buyer"},
+        "properties": {"title": "Flat", "property_type": "apartment", "address": unique, "price": 100000},
+    }.get(resource, {})
+
+
+@pytest.fixture
+def create(client):
+    """``create(resource, **values)`` POSTs a row over sensible defaults and returns it."""
+
+    def create(resource: str, **values):
+        response = client.post(f"/api/v1/{resource}/", json={**_defaults(resource), **values})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return create
+
+
+@pytest.fixture
+def create_property(create, city):
+    return lambda **values: create("properties", **{"city": city, **values})
+
+
+@pytest.fixture
+def statements():
+    """SQL statements (not BEGIN) executed on the app's engines while the test runs."""
+    from sqlalchemy import event
+
+    from app.database import database
+
+    engines = {database.engine, database.read_engine}
+    if database.async_read_engine is not None:
+        engines.add(database.async_read_engine.sync_engine)
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("BEGIN"):
+            executed.append(statement)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", record)
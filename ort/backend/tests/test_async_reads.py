@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import Settings, settings
+from app.database import database
+
+native = pytest.mark.skipif(settings.async_mode != "native", reason="suite runs in threadpool mode")
+
+
+def test_async_mode_follows_the_driver():
+    assert Settings(database_url="sqlite+aiosqlite:///./x.db").async_mode == "native"
+    assert Settings(database_url="postgresql+asyncpg://db/ort").async_mode == "native"
+    assert Settings(database_url="sqlite:///./x.db").async_mode == "threadpool"
+    assert Settings(database_url="sqlite+aiosqlite:///./x.db", db_async_mode="threadpool").async_mode == "threadpool"
+    assert Settings(database_url="sqlite+aiosqlite:///./x.db").sync_database_url == "sqlite:///./x.db"
+
+
+@native
+def test_reads_go_through_the_async_engine(client, create_property, city):
+    prop = create_property()
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = database.async_read_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get("/api/v1/properties/", params={"city": city}).json()["items"][0]["id"] == prop["id"]
+        assert client.get(f"/api/v1/properties/{prop['id']}", params={"fields": "id,title"}).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert sum(statement.startswith("SELECT") for statement in executed) >= 2
+
+
+@native
+def test_async_reads_refuse_writes():
+    import asyncio
+
+    from sqlalchemy import text
+
+    async def write():
+        async with database.async_read_session() as session:
+            await session.execute(text("DELETE FROM users"))
+
+    with pytest.raises(Exception, match="readonly|read-only"):
+        asyncio.run(write())
+
+
+THREADPOOL_SMOKE = """
+from fastapi.testclient import TestClient
+from app.database import database
+from app.main import app
+
+assert database.async_read_session is None
+with TestClient(app) as client:
+    created = client.post("/api/v1/clients/", json={"first_name": "Tia", "last_name": "Pool", "client_type": "buyer"})
+    assert created.status_code == 201, created.text
+    assert client.get(f"/api/v1/clients/{created.json()['id']}").json()["first_name"] == "Tia"
+    assert client.get("/api/v1/clients/").status_code == 200
+"""
+
+
+def test_threadpool_mode_serves_reads(tmp_path):
+    # The mode is fixed when the app is imported, so the other one runs apart.
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/pool.db", "DB_ASYNC_MODE": "threadpool"}
+    result = subprocess.run(
+        [sys.executable, "-c", THREADPOOL_SMOKE],
+        cwd=tmp_path, env={**env, "PYTHONPATH": str(Path(__file__).resolve().parents[1])},
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.fixture
+def sale(create, create_property):
+    def sale(price):
+        return create(
+            "transactions", property_id=create_property()["id"], agent_id=create("users")["id"],
+            buyer_id=create("clients")["id"], sale_price=price, transaction_date="2099-01-01",
+        )
+
+    return sale
+
+
+def test_balance_sums_payments(client, create, sale):
+    transaction = sale(200000)
+    for amount in (50000, 30000.25):
+        create("payments", transaction_id=transaction["id"], amount=amount)
+
+    balance = client.get(f"/api/v1/transactions/{transaction['id']}/balance").json()
+    assert balance == {
+        "transaction_id": transaction["id"],
+        "sale_price": 200000,
+        "total_paid": 80000.25,
+        "remaining_balance": 119999.75,
+        "percent_paid": pytest.approx(40.000125),
+    }
+
+
+def test_balances_keep_request_order_and_skip_unknown_ids(client, create, sale):
+    paid, unpaid = sale(1000), sale(2000)
+    create("payments", transaction_id=paid["id"], amount=1000)
+
+    response = client.get("/api/v1/transactions/balances", params={"ids": f"{unpaid['id']},999999,{paid['id']}"})
+    assert response.status_code == 200
+    assert [(b["transaction_id"], b["total_paid"], b["percent_paid"]) for b in response.json()] == [
+        (unpaid["id"], 0, 0), (paid["id"], 1000, 100),
+    ]
+
+
+def test_balance_of_unknown_transaction_is_404(client):
+    assert client.get("/api/v1/transactions/999999/balance").status_code == 404
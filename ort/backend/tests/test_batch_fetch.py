@@ -0,0 +1,29 @@
+def test_ids_come_back_in_request_order_with_missing_ones_listed(client, create_property):
+    a, b, c = (create_property()["id"] for _ in range(3))
+    response = client.get("/api/v1/properties/", params={"ids": f"{c},999999,{a},{c},{b}"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [c, a, b]
+    assert body["missing"] == [999999]
+
+
+def test_ids_work_with_sparse_fields(client, create):
+    first, second = create("clients"), create("clients")
+    body = client.get("/api/v1/clients/", params={"ids": f"{second['id']},{first['id']}", "fields": "id,first_name"}).json()
+    assert body["items"] == [
+        {"id": second["id"], "first_name": second["first_name"]},
+        {"id": first["id"], "first_name": first["first_name"]},
+    ]
+    assert body["missing"] == []
+
+
+def test_every_collection_accepts_ids(client):
+    for resource in ("users", "clients", "properties", "property-images", "listings", "inquiries",
+                     "appointments", "transactions", "payments"):
+        body = client.get(f"/api/v1/{resource}/", params={"ids": "999998,999999"}).json()
+        assert body["items"] == [] and body["missing"] == [999998, 999999], resource
+
+
+def test_bad_id_lists_are_rejected(client):
+    for ids in ("1,x", ",", ",".join(str(i) for i in range(1, 1002))):
+        assert client.get("/api/v1/properties/", params={"ids": ids}).status_code == 400, ids
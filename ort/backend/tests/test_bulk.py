@@ -0,0 +1,50 @@
+def _bulk(client, resource, rows):
+    return client.post(f"/api/v1/{resource}/bulk", json=rows)
+
+
+def _row(city, **values):
+    return {"title": "Flat", "property_type": "apartment", "address": "1 Bulk St", "city": city, "price": 100000.5, **values}
+
+
+def test_valid_batch_is_created_in_order(client, city):
+    response = _bulk(client, "properties", [_row(city, title=f"Row {i}") for i in range(3)])
+    assert response.status_code == 201
+    body = response.json()
+    assert body["errors"] == []
+    assert [row["title"] for row in body["created"]] == ["Row 0", "Row 1", "Row 2"]
+    assert all(row["price"] == 100000.5 and row["version"] == 1 for row in body["created"])
+
+    listed = client.get("/api/v1/properties/", params={"city": city}).json()["items"]
+    assert [p["id"] for p in listed] == [row["id"] for row in body["created"]]
+
+
+def test_rejected_rows_are_reported_by_index(client, city):
+    rows = [
+        _row(city, title="ok 0"),
+        _row(city, agent_id=999999),  # foreign key
+        _row(city, price=-1),  # validation
+        _row(city, title="ok 3"),
+        _row(city, owner_id=999999),  # foreign key
+    ]
+    response = _bulk(client, "properties", rows)
+    assert response.status_code == 207
+    body = response.json()
+    assert [row["title"] for row in body["created"]] == ["ok 0", "ok 3"]
+    assert [(error["index"], error["errors"][0]["type"]) for error in body["errors"]] == [
+        (1, "integrity_error"), (2, "greater_than"), (4, "integrity_error"),
+    ]
+
+    # The rows retried after the failed batch statement were written once.
+    listed = client.get("/api/v1/properties/", params={"city": city}).json()["items"]
+    assert sorted(p["title"] for p in listed) == ["ok 0", "ok 3"]
+
+
+def test_batch_with_only_rejected_rows_creates_nothing(client, city):
+    response = _bulk(client, "properties", [_row(city, agent_id=999999)])
+    assert response.status_code == 207
+    assert response.json()["created"] == []
+    assert client.get("/api/v1/properties/", params={"city": city}).json()["items"] == []
+
+
+def test_too_many_rows_are_refused(client):
+    assert _bulk(client, "clients", [{}] * 1001).status_code == 400
@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def urls(city, create_property):
+    prop = create_property()
+    return prop, [
+        f"/api/v1/properties/{prop['id']}",
+        f"/api/v1/properties/?city={city}",
+        f"/api/v1/properties/?city={city}&fields=id,version,title",
+        f"/api/v1/properties/?ids={prop['id']}",
+        f"/api/v1/properties/?city={city}&include=images",
+    ]
+
+
+def test_matching_if_none_match_gets_304(client, urls):
+    for url in urls[1]:
+        # Twice: once rendered by the route, once replayed from the cache.
+        for _ in range(2):
+            etag = client.get(url).headers["ETag"]
+            response = client.get(url, headers={"If-None-Match": etag})
+            assert response.status_code == 304, url
+            assert response.headers["ETag"] == etag
+            assert response.content == b""
+
+
+def test_stale_or_other_etags_get_the_body(client, urls):
+    prop, urls = urls
+    etags = {url: client.get(url).headers["ETag"] for url in urls}
+    assert client.get(urls[0], headers={"If-None-Match": '"other"'}).status_code == 200
+
+    assert client.patch(urls[0], json={"title": "Changed"}).status_code == 200
+    for url in urls:
+        response = client.get(url, headers={"If-None-Match": etags[url]})
+        assert response.status_code == 200, url
+        assert response.headers["ETag"] != etags[url]
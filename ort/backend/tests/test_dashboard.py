@@ -0,0 +1,25 @@
+import pytest
+
+
+def test_summary_counts_and_recent_rows(client, create, create_property):
+    before = client.get("/api/v1/dashboard/summary").json()
+
+    prop = create_property()
+    agent = create("users")
+    buyer = create("clients")
+    sale = create(
+        "transactions", property_id=prop["id"], agent_id=agent["id"], buyer_id=buyer["id"],
+        sale_price=250000.5, transaction_date="2099-01-01",
+    )
+    create(
+        "appointments", property_id=prop["id"], agent_id=agent["id"], client_id=buyer["id"],
+        appointment_date="2099-01-02T10:00:00",
+    )
+
+    after = client.get("/api/v1/dashboard/summary").json()
+    for counter in ("properties", "clients", "transactions", "appointments"):
+        assert after[counter] == before[counter] + 1, counter
+    assert after["total_revenue"] == pytest.approx(before["total_revenue"] + 250000.5)
+    assert after["recent_properties"][0]["id"] == prop["id"]
+    assert after["recent_transactions"][0]["id"] == sale["id"]
+    assert len(after["recent_properties"]) <= 5
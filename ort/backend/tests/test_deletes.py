@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from app.core.config import settings
+from app.database.database import Base, create_db_engine, update_foreign_keys
+
+
+@pytest.fixture
+def sale(create, create_property):
+    agent, buyer = create("users"), create("clients")
+    prop = create_property(agent_id=agent["id"], owner_id=buyer["id"])
+    transaction = create(
+        "transactions", property_id=prop["id"], agent_id=agent["id"], buyer_id=buyer["id"],
+        sale_price=10, transaction_date="2099-01-01",
+    )
+    return {"agent": agent, "buyer": buyer, "property": prop, "transaction": transaction}
+
+
+def test_delete_of_unknown_row_is_404(client):
+    for resource in ("users", "clients", "properties", "property-images"):
+        assert client.delete(f"/api/v1/{resource}/999999").status_code == 404, resource
+
+
+def test_delete_of_a_referenced_row_is_409(client, sale):
+    # Transactions keep their agent; there is no ON DELETE for them.
+    assert client.delete(f"/api/v1/users/{sale['agent']['id']}").status_code == 409
+    assert client.get(f"/api/v1/users/{sale['agent']['id']}").status_code == 200
+
+
+def test_delete_cascades_and_nulls_in_the_database(client, create, create_property):
+    agent, visitor = create("users"), create("clients")
+    prop = create_property()
+    image = create("property-images", property_id=prop["id"], image_url="https://img.example/1.jpg")
+    visit = create(
+        "appointments", property_id=create_property()["id"], agent_id=agent["id"], client_id=visitor["id"],
+        appointment_date="2099-01-01T10:00:00",
+    )
+
+    assert client.delete(f"/api/v1/properties/{prop['id']}").status_code == 200
+    assert client.get(f"/api/v1/property-images/{image['id']}").status_code == 404
+
+    assert client.delete(f"/api/v1/users/{agent['id']}").status_code == 200
+    after = client.get(f"/api/v1/appointments/{visit['id']}").json()
+    assert after["version"] == visit["version"] + 1
+
+
+def test_bulk_delete_reports_missing_ids(client, create):
+    a, b = create("clients")["id"], create("clients")["id"]
+    response = client.delete("/api/v1/clients/", params={"ids": f"{b},999999,{a}"})
+    assert response.status_code == 200
+    assert response.json() == {"deleted": [b, a], "missing": [999999]}
+    assert client.get("/api/v1/clients/", params={"ids": f"{a},{b}"}).json()["items"] == []
+
+
+def test_bulk_delete_is_all_or_nothing(client, create, sale):
+    free = create("users")["id"]
+    response = client.delete("/api/v1/users/", params={"ids": f"{free},{sale['agent']['id']}"})
+    assert response.status_code == 409
+    assert client.get(f"/api/v1/users/{free}").status_code == 200
+
+
+OLD_APPOINTMENTS = """
+CREATE TABLE appointments (
+    id INTEGER NOT NULL PRIMARY KEY,
+    property_id INTEGER REFERENCES properties (id) ON DELETE CASCADE,
+    agent_id INTEGER REFERENCES users (id),
+    client_id INTEGER REFERENCES clients (id),
+    appointment_date DATETIME NOT NULL,
+    status VARCHAR(9)
+)
+"""
+
+
+def test_update_foreign_keys_rebuilds_old_sqlite_tables(tmp_path):
+    engine = create_db_engine(settings, url=f"sqlite:///{tmp_path}/old.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE appointments")
+        connection.exec_driver_sql(OLD_APPOINTMENTS)
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, role, first_name, last_name, email, password_hash) VALUES (1, 'agent', 'Ada', 'Agent', 'a@x', 'x')"
+        )
+        connection.exec_driver_sql("INSERT INTO appointments (id, agent_id, appointment_date) VALUES (7, 1, '2099-01-01')")
+
+    update_foreign_keys(engine)
+    update_foreign_keys(engine)  # nothing left to do
+
+    ondelete = {
+        fk["constrained_columns"][0]: fk["options"].get("ondelete")
+        for fk in inspect(engine).get_foreign_keys("appointments")
+    }
+    assert ondelete == {"property_id": "CASCADE", "agent_id": "SET NULL", "client_id": "SET NULL"}
+    with engine.begin() as connection:
+        assert connection.execute(text("SELECT agent_id, version FROM appointments")).all() == [(1, 1)]
+        connection.exec_driver_sql("DELETE FROM users WHERE id = 1")
+        assert connection.execute(text("SELECT id, agent_id FROM appointments")).all() == [(7, None)]
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+    engine.dispose()
@@ -0,0 +1,32 @@
+from app.core.metrics import entity_cache_metrics
+
+
+def _served(table: str) -> int:
+    counts = entity_cache_metrics.snapshot().get(table, {})
+    return sum(counts.get(outcome, 0) for outcome in ("local_hits", "hits", "negative_hits"))
+
+
+def test_detail_is_served_from_cache_and_refreshed_after_writes(client, create_property):
+    detail = f"/api/v1/properties/{create_property(title='Before')['id']}"
+    assert client.get(detail).json()["title"] == "Before"
+    served = _served("properties")
+    assert client.get(detail).json()["title"] == "Before"
+    assert _served("properties") == served + 1
+
+    assert client.patch(detail, json={"title": "After"}).status_code == 200
+    assert client.get(detail).json()["title"] == "After"
+
+
+def test_cached_404_is_cleared_by_a_create(client, create_property):
+    last = create_property()["id"]
+    assert client.get(f"/api/v1/properties/{last + 1}").status_code == 404
+    assert client.get(f"/api/v1/properties/{last + 1}").status_code == 404
+    assert create_property()["id"] == last + 1
+    assert client.get(f"/api/v1/properties/{last + 1}").status_code == 200
+
+
+def test_deleted_detail_is_not_served_from_cache(client, create_property):
+    detail = f"/api/v1/properties/{create_property()['id']}"
+    assert client.get(detail).status_code == 200
+    assert client.delete(detail).status_code == 200
+    assert client.get(detail).status_code == 404
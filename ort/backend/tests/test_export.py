@@ -0,0 +1,81 @@
+import asyncio
+import csv
+import io
+import json
+
+from starlette.responses import StreamingResponse
+
+from app.cache.responses import ResponseCache, ResponseCacheMiddleware
+
+
+def test_ndjson_and_csv_export_every_row(client, create_property):
+    ids = {create_property(title=f"Row {i}")["id"] for i in range(3)}
+
+    response = client.get("/api/v1/export/properties")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert ids <= {row["id"] for row in rows}
+    assert "password_hash" not in client.get("/api/v1/export/users").text
+
+    response = client.get("/api/v1/export/properties", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert ids <= {int(row["id"]) for row in rows}
+    assert set(rows[0]) >= {"id", "title", "price", "version"}
+
+
+def test_unknown_export_is_404(client):
+    assert client.get("/api/v1/export/secrets").status_code == 404
+
+
+def test_export_skips_the_response_cache(client, create_property):
+    create_property()
+    for _ in range(2):
+        response = client.get("/api/v1/export/properties")
+        assert "X-Cache" not in response.headers
+
+
+async def _get(middleware, path="/export"):
+    messages = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # StreamingResponse listens for a disconnect while it streams.
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+    await middleware(scope, receive, send)
+    return messages
+
+
+def test_streamed_responses_are_neither_buffered_nor_coalesced():
+    runs = []
+
+    async def app(scope, receive, send):
+        runs.append(scope["path"])
+        release = asyncio.Event()
+
+        async def chunks():
+            yield b"first\n"
+            await release.wait()
+            yield b"second\n"
+
+        asyncio.get_running_loop().call_later(0.01, release.set)
+        await StreamingResponse(chunks(), headers={"Surrogate-Key": "properties"})(scope, receive, send)
+
+    async def scenario():
+        cache = ResponseCache(1024 * 1024, 60)
+        middleware = ResponseCacheMiddleware(app, cache=cache, coalesce=True)
+        results = await asyncio.gather(_get(middleware), _get(middleware))
+        return cache, results
+
+    cache, results = asyncio.run(scenario())
+    assert len(runs) == 2
+    assert cache.get("/export") is None
+    for messages in results:
+        assert b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body") == b"first\nsecond\n"
+        assert (b"x-cache", b"COALESCED") not in messages[0]["headers"]
@@ -0,0 +1,41 @@
+from app.cache.fragments import ENTRY_OVERHEAD, FragmentCache
+
+
+def test_a_render_that_races_an_invalidation_is_not_stored():
+    cache = FragmentCache(max_bytes=10 * ENTRY_OVERHEAD)
+    versions = cache.versions("clients", [1, 2])
+    cache.invalidate("clients", 1)
+    cache.put("clients", 1, versions[1], b"stale")
+    cache.put("clients", 2, versions[2], b"fresh")
+    assert cache.get_many("clients", cache.versions("clients", [1, 2])) == {2: b"fresh"}
+
+    versions = cache.versions("clients", [2])
+    cache.invalidate_tables("clients")
+    assert cache.get_many("clients", versions) == {}
+    cache.put("clients", 2, versions[2], b"stale")
+    assert cache.get_many("clients", cache.versions("clients", [2])) == {}
+
+
+def test_invalidations_stay_within_the_cache_budget():
+    cache = FragmentCache(max_bytes=4 * ENTRY_OVERHEAD)
+    in_flight = cache.versions("clients", [1])
+    for i in range(1000):
+        cache.invalidate("clients", i)
+    assert len(cache._invalidated) <= cache.max_invalidations == 4
+
+    # Forgotten invalidations still refuse renders that started before them,
+    cache.put("clients", 1, in_flight[1], b"stale")
+    assert cache.get_many("clients", cache.versions("clients", [1])) == {}
+    # but not the ones that started after.
+    cache.put("clients", 1, cache.versions("clients", [1])[1], b"fresh")
+    assert cache.get_many("clients", cache.versions("clients", [1])) == {1: b"fresh"}
+
+
+def test_least_recently_used_fragments_are_evicted_first():
+    cache = FragmentCache(max_bytes=2 * (ENTRY_OVERHEAD + 1))
+    for i in (1, 2):
+        cache.put("clients", i, cache.versions("clients", [i])[i], b"x")
+    cache.get_many("clients", {1: 0})
+    cache.put("clients", 3, cache.versions("clients", [3])[3], b"x")
+    assert set(cache.get_many("clients", cache.versions("clients", [1, 2, 3]))) == {1, 3}
+    assert cache.snapshot()["bytes"] == 2 * (ENTRY_OVERHEAD + 1)
@@ -0,0 +1,87 @@
+import pytest
+
+
+def _import(client, csv: str):
+    response = client.post("/api/v1/imports/properties", files={"file": ("feed.csv", csv.encode(), "text/csv")})
+    assert response.status_code == 202, response.text
+    # TestClient runs the background import before returning.
+    job = client.get(f"/api/v1/imports/{response.json()['id']}").json()
+    assert job["status"] == "completed", job
+    return job
+
+
+def test_rerun_keeps_columns_missing_from_the_feed(client, city):
+    _import(
+        client,
+        "title,property_type,address,city,price,description,bedrooms\n"
+        f"Loft,apartment,1 Main St,{city},100000,Sunny,3\n",
+    )
+    # A narrower feed for the same property, with a row repeated.
+    job = _import(
+        client,
+        "title,property_type,address,city,price\n"
+        f"Loft,apartment,1 Main St,{city},120000\n"
+        f"Loft,apartment,1 Main St,{city},125000\n"
+        f"House,house,2 Main St,{city},90000\n",
+    )
+    assert (job["rows_processed"], job["rows_created"], job["rows_updated"]) == (3, 1, 2)
+
+    items = client.get("/api/v1/properties/", params={"city": city, "sort": "price"}).json()["items"]
+    assert [(p["address"], p["price"]) for p in items] == [("2 Main St", 90000), ("1 Main St", 125000)]
+    assert (items[1]["description"], items[1]["bedrooms"]) == ("Sunny", 3)
+    assert items[1]["version"] == 2
+
+
+def test_rows_the_database_refuses_are_recorded_and_the_job_goes_on(client, city):
+    job = _import(
+        client,
+        "title,property_type,address,city,price,agent_id\n"
+        f"Good,house,1 Main St,{city},100000,\n"
+        f"Bad agent,house,2 Main St,{city},100000,999999\n"
+        f"Bad price,house,3 Main St,{city},-5,\n"
+        f"Also good,house,4 Main St,{city},100000,\n",
+    )
+    assert (job["rows_processed"], job["rows_created"], job["rows_failed"]) == (4, 2, 2)
+
+    errors = client.get(f"/api/v1/imports/{job['id']}/errors").json()["items"]
+    assert [(e["row_number"], e["errors"][0]["type"]) for e in errors] == [(3, "integrity_error"), (4, "greater_than")]
+    items = client.get("/api/v1/properties/", params={"city": city}).json()["items"]
+    assert sorted(p["title"] for p in items) == ["Also good", "Good"]
+
+
+def test_errors_of_unknown_job_are_404(client):
+    assert client.get("/api/v1/imports/999999/errors").status_code == 404
+
+
+def test_feed_without_required_columns_fails_the_job(client):
+    response = client.post("/api/v1/imports/properties", files={"file": ("feed.csv", b"title,price\nLoft,1\n", "text/csv")})
+    job = client.get(f"/api/v1/imports/{response.json()['id']}").json()
+    assert job["status"] == "failed"
+    assert "address" in job["error"]
+    assert job["finished_at"] is not None
+
+
+def test_upload_is_removed_when_the_job_cannot_be_created(client, monkeypatch, tmp_path):
+    import tempfile
+
+    from app.database.writer import writer
+
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(writer, "call", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/api/v1/imports/properties", files={"file": ("feed.csv", b"title\n", "text/csv")})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_batches_go_through_the_write_queue(client, city, monkeypatch):
+    from app.database.writer import writer
+
+    calls = []
+    run = writer.run
+    monkeypatch.setattr(writer, "run", lambda fn, *args, **kwargs: calls.append(fn.__name__) or run(fn, *args, **kwargs))
+    _import(client, "title,property_type,address,city,price\n" f"Loft,apartment,9 Main St,{city},1\n")
+    assert calls == ["set_status", "write_batch", "set_status"]
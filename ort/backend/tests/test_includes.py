@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+
+PROPERTY_INCLUDE = "images,listings,inquiries,appointments,agent,owner"
+
+
+@pytest.fixture
+def furnished(create, create_property):
+    """A property with some of every related row."""
+
+    def furnished():
+        agent, owner = create("users"), create("clients")
+        prop = create_property(agent_id=agent["id"], owner_id=owner["id"])
+        for i in range(2):
+            create("property-images", property_id=prop["id"], image_url=f"https://img.example/{uuid.uuid4().hex}.jpg")
+            create("inquiries", property_id=prop["id"], client_id=owner["id"], message=f"Hi {i}")
+        create("listings", property_id=prop["id"], listing_type="sale", listed_price=1, listing_date="2099-01-01")
+        create(
+            "appointments", property_id=prop["id"], agent_id=agent["id"], client_id=owner["id"],
+            appointment_date="2099-01-01T10:00:00",
+        )
+        return prop
+
+    return furnished
+
+
+def _page(client, statements, city):
+    statements.clear()
+    response = client.get("/api/v1/properties/", params={"city": city, "include": PROPERTY_INCLUDE})
+    assert response.status_code == 200
+    return response.json()["items"], len(statements)
+
+
+def test_include_query_count_does_not_grow_with_the_page(client, city, furnished, statements):
+    furnished()
+    items, one = _page(client, statements, city)
+    assert len(items) == 1
+    assert len(items[0]["images"]) == 2 and len(items[0]["inquiries"]) == 2
+    assert len(items[0]["listings"]) == 1 and len(items[0]["appointments"]) == 1
+    assert items[0]["agent"]["id"] and items[0]["owner"]["id"]
+
+    for _ in range(4):
+        furnished()
+    items, five = _page(client, statements, city)
+    assert len(items) == 5
+    # One statement for the page with its to-one joins, one per to-many relation.
+    assert five == one <= 5
+
+
+def test_detail_include_loads_related_rows(client, furnished, statements):
+    prop = furnished()
+    statements.clear()
+    response = client.get(f"/api/v1/properties/{prop['id']}", params={"include": "images,agent"})
+    body = response.json()
+    assert len(body["images"]) == 2 and body["agent"] is not None
+    assert "listings" not in body
+    assert len(statements) <= 2
+
+
+def test_transaction_include(client, create, create_property, statements):
+    agent, buyer, prop = create("users"), create("clients"), create_property()
+    sale = create(
+        "transactions", property_id=prop["id"], agent_id=agent["id"], buyer_id=buyer["id"],
+        sale_price=10, transaction_date="2099-01-01",
+    )
+    create("payments", transaction_id=sale["id"], amount=5)
+    statements.clear()
+    body = client.get(f"/api/v1/transactions/{sale['id']}", params={"include": "payments,buyer,agent,property"}).json()
+    assert [p["amount"] for p in body["payments"]] == [5]
+    assert (body["buyer"]["id"], body["agent"]["id"], body["property"]["id"]) == (buyer["id"], agent["id"], prop["id"])
+    assert len(statements) <= 2
+
+
+def test_unknown_include_is_rejected(client):
+    assert client.get("/api/v1/properties/", params={"include": "secrets"}).status_code in (400, 422)
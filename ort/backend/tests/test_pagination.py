@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pytest
+
+from app.api.v1.pagination import SortKey
+from app.models.models import Property
+
+
+def test_decimal_cursor_value_keeps_its_decimal_digits():
+    # Decimal(250000.1) would be 250000.100000000005820766091346740722656250,
+    # which no stored price equals, so ties would be skipped or repeated.
+    assert SortKey(Property.price).coerce(250000.1) == Decimal("250000.1")
+
+
+def _walk(client, params):
+    ids, cursor = [], None
+    while True:
+        response = client.get("/api/v1/properties/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort", ["price", "-price"])
+@pytest.mark.parametrize("fields", [None, "id,price"])
+def test_tied_decimal_prices_page_across_boundaries(client, city, create_property, sort, fields):
+    prices = [250000.1, 250000.1, 250000.1, 99.99, 250000.1, 300000.55, 300000.55]
+    created = [create_property(price=price) for price in prices]
+    # The id tiebreaker follows the direction of the price.
+    expected = sorted(created, key=lambda p: (Decimal(str(p["price"])), p["id"]), reverse=sort.startswith("-"))
+
+    params = {"city": city, "sort": sort, "limit": 2}
+    if fields:
+        params["fields"] = fields
+    assert _walk(client, params) == [p["id"] for p in expected]
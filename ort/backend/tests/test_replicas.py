@@ -0,0 +1,100 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from starlette.requests import Request
+
+from app.database.database import _route
+from app.database.routing import PRIMARY_COOKIE, PRIMARY_HEADER, ReadYourWritesMiddleware, pinned
+
+
+def _request(headers=()):
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": list(headers)})
+
+
+def test_pinned_until_the_marker_expires():
+    future, past = f"{time.time() + 60:.3f}".encode(), f"{time.time() - 1:.3f}".encode()
+    assert pinned(_request([(PRIMARY_HEADER.lower().encode(), future)]))
+    assert pinned(_request([(b"cookie", f"{PRIMARY_COOKIE}=".encode() + future)]))
+    assert not pinned(_request([(PRIMARY_HEADER.lower().encode(), past)]))
+    assert not pinned(_request([(PRIMARY_HEADER.lower().encode(), b"soon")]))
+    assert not pinned(_request())
+
+
+def test_reads_rotate_over_replicas_unless_pinned():
+    assert [_route("primary", ["a", "b"], False) for _ in range(4)] in (["a", "b", "a", "b"], ["b", "a", "b", "a"])
+    assert _route("primary", ["a", "b"], True) == "primary"
+    assert _route("primary", [], False) == "primary"
+
+
+def _send(middleware, method, status):
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": "/", "query_string": b"", "headers": []}
+    asyncio.run(middleware(app)(scope, None, send))
+    return dict((name.decode(), value.decode()) for name, value in sent[0]["headers"])
+
+
+def test_successful_writes_mark_the_client():
+    middleware = lambda app: ReadYourWritesMiddleware(app, window=5)
+    headers = _send(middleware, "POST", 201)
+    assert float(headers[PRIMARY_HEADER.lower()]) > time.time()
+    assert headers["set-cookie"].startswith(f"{PRIMARY_COOKIE}=")
+    assert PRIMARY_HEADER.lower() not in _send(middleware, "POST", 409)
+    assert PRIMARY_HEADER.lower() not in _send(middleware, "GET", 200)
+    assert PRIMARY_HEADER.lower() not in _send(lambda app: ReadYourWritesMiddleware(app, window=0), "POST", 201)
+
+
+REPLICA_SMOKE = """
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.database.database import Base
+from app.models import models  # noqa: F401
+
+# A replica that never catches up: writes only reach the primary.
+Base.metadata.create_all(create_engine(os.environ["REPLICA_SYNC_URL"]))
+
+from app.main import app
+
+with TestClient(app) as client:
+    created = client.post("/api/v1/clients/", json={"first_name": "Rey", "last_name": "Plica", "client_type": "buyer"})
+    assert created.status_code == 201, created.text
+    client_id, until = created.json()["id"], created.headers["X-Read-Primary-Until"]
+    marker = client.cookies.get("read_primary_until")
+    client.cookies.clear()
+
+    # Unpinned reads go to the replica, which lags.
+    assert client.get(f"/api/v1/clients/?ids={client_id}").json()["missing"] == [client_id]
+    assert client.get(f"/api/v1/clients/{client_id}").status_code == 404
+    # The writer's own reads, by header or cookie, go to the primary.
+    assert client.get(f"/api/v1/clients/{client_id}", headers={"X-Read-Primary-Until": until}).status_code == 200
+    assert client.get(f"/api/v1/clients/?ids={client_id}&fields=id", cookies={"read_primary_until": marker}).json()["missing"] == []
+"""
+
+
+def test_pinned_clients_read_their_writes_from_the_primary(tmp_path):
+    driver = os.environ.get("TEST_DATABASE_DRIVER", "sqlite+aiosqlite")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"{driver}:///{tmp_path}/primary.db",
+        "DB_REPLICA_URLS": f'["{driver}:///{tmp_path}/replica.db"]',
+        "REPLICA_SYNC_URL": f"sqlite:///{tmp_path}/replica.db",
+        "PYTHONPATH": str(Path(__file__).resolve().parents[1]),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", REPLICA_SMOKE], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,28 @@
+def test_list_is_purged_after_an_update(client, city, create_property):
+    prop = create_property(title="Before")
+    params = {"city": city}
+    assert client.get("/api/v1/properties/", params=params).headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/properties/", params=params).headers["X-Cache"] == "HIT"
+
+    assert client.patch(f"/api/v1/properties/{prop['id']}", json={"title": "After"}).status_code == 200
+    response = client.get("/api/v1/properties/", params=params)
+    assert response.headers["X-Cache"] == "MISS"
+    assert [p["title"] for p in response.json()["items"]] == ["After"]
+
+
+def test_list_is_purged_when_a_row_joins_or_leaves_it(client, city, create_property):
+    first = create_property()
+    assert len(client.get("/api/v1/properties/", params={"city": city}).json()["items"]) == 1
+    create_property()
+    response = client.get("/api/v1/properties/", params={"city": city})
+    assert response.headers["X-Cache"] == "MISS"
+    assert len(response.json()["items"]) == 2
+
+    assert client.delete(f"/api/v1/properties/{first['id']}").status_code == 200
+    assert len(client.get("/api/v1/properties/", params={"city": city}).json()["items"]) == 1
+
+
+def test_cacheable_lists_advertise_a_shared_max_age(client, city, create_property):
+    create_property()
+    response = client.get("/api/v1/properties/", params={"city": city})
+    assert response.headers["Cache-Control"].startswith("public, max-age=0, s-maxage=")
@@ -0,0 +1,32 @@
+def test_patch_writes_only_the_given_fields_and_bumps_the_version(client, create_property):
+    prop = create_property(title="Before", description="Keep me", bedrooms=2)
+    response = client.patch(f"/api/v1/properties/{prop['id']}", json={"title": "After"})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["title"], body["description"], body["bedrooms"]) == ("After", "Keep me", 2)
+    assert body["version"] == prop["version"] + 1
+
+
+def test_empty_patch_returns_the_row_unchanged(client, create):
+    user = create("users")
+    response = client.patch(f"/api/v1/users/{user['id']}", json={})
+    assert response.status_code == 200
+    assert response.json()["version"] == user["version"]
+
+
+def test_patch_of_unknown_row_is_404(client):
+    for resource in ("users", "clients", "properties"):
+        assert client.patch(f"/api/v1/{resource}/999999", json={"first_name": "Nobody"}).status_code == 404, resource
+
+
+def test_patch_the_database_refuses_is_409(client, create):
+    taken, user = create("users"), create("users")
+    response = client.patch(f"/api/v1/users/{user['id']}", json={"email": taken["email"]})
+    assert response.status_code == 409
+    response = client.patch("/api/v1/clients/%d" % create("clients")["id"], json={"agent_id": 999999})
+    assert response.status_code == 409
+
+
+def test_patch_cannot_null_required_fields(client, create_property):
+    prop = create_property()
+    assert client.patch(f"/api/v1/properties/{prop['id']}", json={"price": None}).status_code == 422
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.database.database import Base, create_db_engine
+from app.database.writer import WriteQueue
+from app.models.models import Client
+
+
+@pytest.fixture
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path}/writer.db"
+    engine = create_db_engine(settings, url=url)
+    Base.metadata.create_all(engine)
+    reader = create_db_engine(settings, url=url, read_only=True)
+    yield engine, reader
+    engine.dispose()
+    reader.dispose()
+
+
+@pytest.fixture
+def session_factory(engines):
+    return sessionmaker(bind=engines[0])
+
+
+@pytest.fixture
+def names(engines):
+    """The names of the committed clients, read on a separate connection."""
+    read_session = sessionmaker(bind=engines[1])
+
+    def names():
+        with read_session() as db:
+            return sorted(db.scalars(select(Client.first_name)))
+
+    return names
+
+
+@pytest.fixture
+def make_queue(session_factory):
+    queues = []
+
+    def make_queue(**options):
+        queues.append(WriteQueue(session_factory, **{"window": 0.0, "timeout": 5.0, **options}))
+        return queues[-1]
+
+    yield make_queue
+    for queue in queues:
+        queue.close()
+
+
+def add_client(db, name, fail=False):
+    db.execute(insert(Client).values(first_name=name, last_name="Test", client_type="buyer"))
+    if fail:
+        raise ValueError(name)
+    return name
+
+
+def test_a_failing_item_does_not_undo_its_group(make_queue, names):
+    queue = make_queue(window=0.2)
+    futures = [
+        queue.submit(add_client, "first"),
+        queue.submit(add_client, "broken", fail=True),
+        queue.submit(add_client, "last"),
+    ]
+    assert futures[0].result(5) == "first"
+    with pytest.raises(ValueError):
+        futures[1].result(5)
+    assert futures[2].result(5) == "last"
+    # The failing item's own insert was rolled back to its savepoint.
+    assert names() == ["first", "last"]
+
+
+def test_writes_are_committed_in_groups(make_queue, names):
+    queue = make_queue(window=0.2)
+    commits = []
+    factory = queue.session_factory
+
+    def counting_factory():
+        session = factory()
+        commit = session.commit
+        session.commit = lambda: commits.append(1) or commit()
+        return session
+
+    queue.session_factory = counting_factory
+    futures = [queue.submit(add_client, f"c{i}") for i in range(10)]
+    assert [f.result(5) for f in futures] == [f"c{i}" for i in range(10)]
+    assert len(commits) == 1
+    assert len(names()) == 10
+
+
+def test_results_arrive_only_after_the_commit(make_queue, names):
+    queue = make_queue()
+
+    def add_and_check(db):
+        add_client(db, "visible")
+        # Not yet committed: a second connection cannot see it.
+        return names()
+
+    assert queue.run(add_and_check) == []
+    assert names() == ["visible"]
+
+
+def test_a_started_write_is_awaited_past_the_timeout(make_queue, names):
+    queue = make_queue(timeout=0.05)
+
+    def slow(db):
+        time.sleep(0.3)
+        return add_client(db, "slow")
+
+    assert asyncio.run(queue.call(slow)) == "slow"
+    assert queue.run(slow) == "slow"
+    assert names() == ["slow", "slow"]
+
+
+def test_a_write_still_queued_at_the_timeout_is_dropped(make_queue, names):
+    queue = make_queue(timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+    blocker = queue.submit(lambda db: started.set() or release.wait(5))
+    started.wait(5)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(queue.call(add_client, "late"))
+    with pytest.raises(TimeoutError):
+        queue.run(add_client, "later")
+    release.set()
+    blocker.result(5)
+    queue.run(add_client, "after")
+    assert names() == ["after"]